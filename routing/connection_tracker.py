@@ -9,7 +9,7 @@ import logging
 import time
 import json
 from typing import Dict, List, Optional, Set
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from enum import Enum
 
 class ConnectionState(Enum):
@@ -40,6 +40,10 @@ class Connection:
     last_seen: float = 0.0
     packets: int = 0
     bytes: int = 0
+    
+    def to_dict(self) -> dict:
+        """Field values as a dict; a shallow copy, unlike asdict()'s recursive deepcopy"""
+        return self.__dict__.copy()
 
 class ConnectionTracker:
     """Manages connection tracking and packet marking for session persistence"""
@@ -309,7 +313,7 @@ class ConnectionTracker:
             'timestamp': time.time(),
             'total_connections': len(self.connections),
             'sticky_sessions': list(self.sticky_sessions),
-            'connections': [asdict(conn) for conn in self.connections.values()]
+            'connections': [conn.to_dict() for conn in self.connections.values()]
         }
         
         if format == 'json':
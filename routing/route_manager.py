@@ -30,7 +30,8 @@ class WANInterface:
 class RouteManager:
     """Manages multipath routing and load balancing across multiple WAN interfaces"""
     
-    def __init__(self, config_file: str = "/opt/routeros/config/interfaces.json"):
+    def __init__(self, config_file: str = "/opt/routeros/config/interfaces.json",
+                 initialize_routing: bool = True):
         self.config_file = config_file
         self.interfaces: Dict[str, WANInterface] = {}
         self.logger = logging.getLogger(__name__)
@@ -42,7 +43,8 @@ class RouteManager:
         
         self._setup_logging()
         self._load_config()
-        self._initialize_routing()
+        if initialize_routing:
+            self._initialize_routing()
     
     def _setup_logging(self):
         """Configure logging for the route manager"""
@@ -25,7 +25,9 @@ class RoutingManagerService:
     
     def __init__(self):
         self.config_file = "/opt/routeros/config/interfaces.json"
-        self.status_file = "/opt/routeros/web/status.json"
+        # Next to the watchdog's status.json on tmpfs, but a file of its own:
+        # its shape differs and it must not replace the watchdog snapshot
+        self.status_file = "/run/routeros/routing_status.json"
         self.running = False
         self.logger = self._setup_logging()
         self.route_manager = None
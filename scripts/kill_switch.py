@@ -19,7 +19,7 @@ class KillSwitchManager:
     def __init__(self):
         self.logger = self._setup_logging()
         self.watchdog_script = '/opt/routeros/watchdog/watchdog_service.py'
-        self.status_file = '/opt/routeros/web/status.json'
+        self.status_file = '/run/routeros/status.json'
         self.config_file = '/opt/routeros/config/interfaces.json'
         
     def _setup_logging(self) -> logging.Logger:
@@ -4,15 +4,25 @@ Smart Multi-WAN Router OS - Health Monitor Watchdog
 Performs continuous health checks, ICMP probing, and intelligent failover
 """
 
+import atexit
 import subprocess
 import time
 import logging
+import logging.handlers
+import queue
 import threading
+import itertools
 import json
 import signal
+import socket
+import select
+import shutil
+import struct
 import sys
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+import os
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+from dataclasses import dataclass, asdict, replace
+from types import MappingProxyType
 from enum import Enum
 from datetime import datetime
 
@@ -33,16 +43,54 @@ class HealthCheckResult:
     last_success: float
     error_message: str = ""
 
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+ICMP_PAYLOAD = b'routeros-health'.ljust(56, b'\x00')
+
+# Monitoring loop error handling
+MAX_LOOP_BACKOFF = 300  # seconds
+MAX_LOOP_FAILURES = 20
+
+def _icmp_checksum(data: bytes) -> int:
+    """RFC 1071 one's-complement checksum (summed by struct in C, no Python loop)"""
+    if len(data) % 2:
+        data += b'\x00'
+    total = sum(struct.unpack(f'!{len(data) // 2}H', data))
+    total = (total & 0xFFFF) + (total >> 16)
+    total += total >> 16
+    return ~total & 0xFFFF
+
 class HealthMonitor:
     """Monitors WAN interface health and triggers failover when needed"""
     
-    def __init__(self, config_file: str = "/opt/routeros/config/health_monitor.json"):
+    def __init__(self, config_file: str = "/opt/routeros/config/health_monitor.json",
+                 handle_signals: bool = False):
         self.config_file = config_file
         self.interfaces: Dict[str, Dict] = {}
         self.health_results: Dict[str, HealthCheckResult] = {}
-        self.monitoring_active = False
+        self._health_snapshot: Mapping[str, HealthCheckResult] = MappingProxyType({})
         self.monitor_thread = None
+        self._stop = threading.Event()
+        self._stop.set()  # set while monitoring is not running
+        self._lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
+        self._log_listener: Optional[logging.handlers.QueueListener] = None
+        
+        # Integration hooks registered by the watchdog service
+        self._reconfig_hooks: List[Callable[[Mapping[str, HealthCheckResult]], None]] = []
+        self._interface_control_hook: Optional[Callable[[str, str], None]] = None
+        
+        self._raw_icmp = True  # cleared if raw sockets are not permitted
+        
+        # ICMP identifier is fixed per process; sequence numbers are shared
+        # across interfaces so every outstanding probe has a unique key
+        self._icmp_ident = os.getpid() & 0xFFFF
+        self._icmp_seq = itertools.count(1)
+        
+        # Absolute ping path and cached argv tuples let subprocess use
+        # posix_spawn instead of fork+exec for the fallback ping
+        self._ping_path = shutil.which('ping') or '/bin/ping'
+        self._ping_argv: Dict[Tuple[str, str, int], Tuple[str, ...]] = {}
         
         # Default configuration
         self.config = {
@@ -63,20 +111,41 @@ class HealthMonitor:
         self._load_config()
         self._initialize_health_tracking()
         
-        # Signal handlers for graceful shutdown
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
+        # Signal handlers for graceful shutdown, only when the monitor runs
+        # as its own process: embedded in the watchdog or the web server the
+        # host owns SIGINT/SIGTERM (and off the main thread signal() fails)
+        if handle_signals:
+            signal.signal(signal.SIGINT, self._signal_handler)
+            signal.signal(signal.SIGTERM, self._signal_handler)
     
     def _setup_logging(self):
-        """Configure logging for health monitor"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('/var/log/routeros-health.log'),
-                logging.StreamHandler()
-            ]
-        )
+        """Configure logging for health monitor
+        
+        Records are queued by the calling thread and written to disk by a
+        QueueListener thread, so probing never waits on log file I/O. The
+        listener runs for the life of the process and is drained at exit,
+        however monitoring ended, so late records are still written.
+        """
+        # Same semantics as basicConfig: leave an already configured root alone
+        if logging.getLogger().handlers:
+            return
+        
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        file_handler = logging.FileHandler('/var/log/routeros-health.log')
+        file_handler.setFormatter(formatter)
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(formatter)
+        
+        log_queue = queue.SimpleQueue()
+        self._log_listener = logging.handlers.QueueListener(log_queue, file_handler, stream_handler)
+        self._log_listener.start()
+        atexit.register(self._log_listener.stop)
+        
+        # The listener's handlers do the formatting; without this basicConfig
+        # would prefix every queued message with its own BASIC_FORMAT
+        queue_handler = logging.handlers.QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
+        logging.basicConfig(level=logging.INFO, handlers=[queue_handler])
     
     def _load_config(self):
         """Load configuration from file"""
@@ -90,6 +159,27 @@ class HealthMonitor:
             self._save_config()
         except Exception as e:
             self.logger.error(f"Failed to load config: {e}, using defaults")
+        
+        self._compile_failover_predicate()
+    
+    def _compile_failover_predicate(self):
+        """Specialize the failover check for the current configuration
+        
+        The retry threshold only changes when config is (re)loaded, so it is
+        bound into a closure here rather than looked up on every check. The
+        closure returns the reason to fail over, or None to stay put.
+        """
+        threshold = self.config['retry_count']
+        failed = HealthStatus.FAILED
+        
+        def failover_reason(hr: HealthCheckResult) -> Optional[str]:
+            if hr.consecutive_failures >= threshold:
+                return f"failed {hr.consecutive_failures} consecutive checks"
+            if hr.status is failed:
+                return "completely failed (100% packet loss)"
+            return None
+        
+        self._failover_reason = failover_reason
     
     def _save_config(self):
         """Save current configuration to file"""
@@ -129,6 +219,27 @@ class HealthMonitor:
             )
             
             self.logger.info(f"Initialized health tracking for {iface_name}")
+        
+        self._publish_results()
+    
+    def _publish_results(self):
+        """Publish an immutable copy of the health results for lock-free readers
+        
+        Writers call this after replacing a result; readers only ever load the
+        snapshot attribute, which is swapped in a single assignment.
+        """
+        self._health_snapshot = MappingProxyType(dict(self.health_results))
+    
+    def _set_status(self, interface: str, status: HealthStatus, enabled: bool):
+        """Replace an interface's result with one in the given status and republish
+        
+        Published results are never modified, so readers of an earlier
+        snapshot keep seeing the values it was taken with.
+        """
+        with self._lock:
+            self.interfaces[interface]['enabled'] = enabled
+            self.health_results[interface] = replace(self.health_results[interface], status=status)
+            self._publish_results()
     
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals"""
@@ -141,14 +252,76 @@ class HealthMonitor:
         Run ping test through specific interface
         Returns: (avg_latency, packet_loss, error_message)
         """
+        if self._raw_icmp:
+            try:
+                return self._run_icmp_probe(interface, target, count)
+            except PermissionError:
+                self.logger.warning("Raw ICMP sockets not permitted, falling back to ping command")
+                self._raw_icmp = False
+            except OSError as e:
+                return 0.0, 100.0, f"Ping error: {str(e)}"
+        
+        return self._run_ping_command(interface, target, count)
+    
+    def _run_icmp_probe(self, interface: str, target: str, count: int) -> Tuple[float, float, str]:
+        """Send ICMP echo requests on a raw socket bound to the interface"""
+        timeout = self.config['timeout_seconds']
+        ident = self._icmp_ident
+        rtts = []
+        
+        sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE, interface.encode())
+            
+            for _ in range(count):
+                seq = next(self._icmp_seq) & 0xFFFF
+                header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, ident, seq)
+                checksum = _icmp_checksum(header + ICMP_PAYLOAD)
+                packet = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, checksum, ident, seq) + ICMP_PAYLOAD
+                
+                sent_at = time.monotonic()
+                sock.sendto(packet, (target, 0))
+                deadline = sent_at + timeout
+                
+                # Wait for our reply, skipping unrelated ICMP traffic
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    ready, _, _ = select.select([sock], [], [], remaining)
+                    if not ready:
+                        break
+                    reply = sock.recv(1024)
+                    ip_header_len = (reply[0] & 0x0F) * 4
+                    if len(reply) < ip_header_len + 8:
+                        continue
+                    icmp_type, _, _, reply_ident, reply_seq = struct.unpack_from('!BBHHH', reply, ip_header_len)
+                    if icmp_type == ICMP_ECHO_REPLY and reply_ident == ident and reply_seq == seq:
+                        rtts.append((time.monotonic() - sent_at) * 1000)
+                        break
+        finally:
+            sock.close()
+        
+        packet_loss = (count - len(rtts)) * 100.0 / count
+        latency = sum(rtts) / len(rtts) if rtts else 0.0
+        return latency, packet_loss, ""
+    
+    def _run_ping_command(self, interface: str, target: str, count: int) -> Tuple[float, float, str]:
+        """Fallback ping test using the system ping command"""
         try:
             # Use ping with specific interface binding
-            cmd = [
-                'ping', '-I', interface, '-c', str(count), '-W', '2',
-                '-q', target
-            ]
+            key = (interface, target, count)
+            cmd = self._ping_argv.get(key)
+            if cmd is None:
+                cmd = self._ping_argv[key] = (
+                    self._ping_path, '-I', interface, '-c', str(count), '-W', '2',
+                    '-q', target
+                )
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            # close_fds=False is safe (Python fds are non-inheritable) and
+            # is required for subprocess to take the posix_spawn path
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10,
+                                    close_fds=False)
             
             if result.returncode != 0:
                 return 0.0, 100.0, f"Ping failed: {result.stderr}"
@@ -191,16 +364,11 @@ class HealthMonitor:
         except Exception as e:
             return 0.0, 100.0, f"Ping error: {str(e)}"
     
-    def _check_interface_health(self, interface: str) -> HealthCheckResult:
-        """Perform health check on specific interface"""
-        iface_info = self.interfaces[interface]
+    def _probe_once(self, interface: str) -> HealthCheckResult:
+        """Probe an interface and classify the result without touching its counters"""
         config = self.config
         current_time = time.time()
         
-        # Update check counters
-        iface_info['total_checks'] += 1
-        iface_info['last_check'] = current_time
-        
         # Perform ping test
         latency, packet_loss, error_msg = self._run_ping_test(
             interface, config['ping_target'], config['retry_count']
@@ -209,37 +377,50 @@ class HealthMonitor:
         # Determine health status
         if packet_loss >= 100.0:
             status = HealthStatus.FAILED
-            iface_info['consecutive_failures'] += 1
-            iface_info['failed_checks'] += 1
             error_msg = "Complete packet loss"
         elif packet_loss > config['max_packet_loss'] or latency > config['max_latency_ms']:
             status = HealthStatus.DEGRADED
-            iface_info['consecutive_failures'] += 1
-            iface_info['failed_checks'] += 1
         else:
             status = HealthStatus.HEALTHY
-            iface_info['consecutive_failures'] = 0
-            iface_info['successful_checks'] += 1
         
-        # Create health result
-        health_result = HealthCheckResult(
+        previous = self.health_results[interface]
+        
+        return HealthCheckResult(
             interface=interface,
             status=status,
             latency=latency,
             packet_loss=packet_loss,
             timestamp=current_time,
-            consecutive_failures=iface_info['consecutive_failures'],
-            last_success=current_time if status == HealthStatus.HEALTHY else iface_info.get('last_success', current_time),
+            consecutive_failures=previous.consecutive_failures,
+            last_success=current_time if status == HealthStatus.HEALTHY else previous.last_success,
             error_message=error_msg
         )
+    
+    def _check_interface_health(self, interface: str) -> HealthCheckResult:
+        """Perform health check on specific interface"""
+        iface_info = self.interfaces[interface]
+        health_result = self._probe_once(interface)
         
-        # Store result
-        self.health_results[interface] = health_result
+        # Update check counters and publish the result together
+        with self._lock:
+            iface_info['total_checks'] += 1
+            iface_info['last_check'] = health_result.timestamp
+            
+            if health_result.status == HealthStatus.HEALTHY:
+                iface_info['consecutive_failures'] = 0
+                iface_info['successful_checks'] += 1
+            else:
+                iface_info['consecutive_failures'] += 1
+                iface_info['failed_checks'] += 1
+            
+            health_result.consecutive_failures = iface_info['consecutive_failures']
+            self.health_results[interface] = health_result
+            self._publish_results()
         
         # Log results
         self.logger.info(
-            f"Health check {interface}: {status.value} "
-            f"(latency: {latency:.1f}ms, loss: {packet_loss:.1f}%, "
+            f"Health check {interface}: {health_result.status.value} "
+            f"(latency: {health_result.latency:.1f}ms, loss: {health_result.packet_loss:.1f}%, "
             f"failures: {iface_info['consecutive_failures']})"
         )
         
@@ -247,30 +428,19 @@ class HealthMonitor:
     
     def _should_trigger_failover(self, interface: str) -> bool:
         """Determine if failover should be triggered for interface"""
-        health_result = self.health_results[interface]
-        config = self.config
-        
-        # Check consecutive failure threshold
-        if health_result.consecutive_failures >= config['retry_count']:
-            self.logger.warning(f"Interface {interface} failed {health_result.consecutive_failures} consecutive checks")
-            return True
-        
-        # Check if completely failed
-        if health_result.status == HealthStatus.FAILED:
-            self.logger.warning(f"Interface {interface} completely failed (100% packet loss)")
-            return True
+        reason = self._failover_reason(self.health_results[interface])
+        if reason is None:
+            return False
         
-        return False
+        self.logger.warning(f"Interface {interface} {reason}")
+        return True
     
     def _trigger_failover(self, interface: str):
         """Trigger failover for specific interface"""
         self.logger.warning(f"Triggering failover for interface {interface}")
         
-        # Disable interface in health tracking
-        self.interfaces[interface]['enabled'] = False
-        
-        # Update health status
-        self.health_results[interface].status = HealthStatus.FAILED
+        # Disable interface in health tracking and publish it as failed
+        self._set_status(interface, HealthStatus.FAILED, enabled=False)
         
         # Trigger routing reconfiguration (this would interface with RouteManager)
         self._reconfigure_routing()
@@ -299,6 +469,19 @@ class HealthMonitor:
         # In a real implementation, this would call RouteManager.update_interface_state()
         # For demonstration, we'll create a simple routing update script
         self._update_routing_tables(active_interfaces)
+        
+        if self._reconfig_hooks:
+            health_status = self.get_health_status()
+            for hook in self._reconfig_hooks:
+                hook(health_status)
+    
+    def add_reconfigure_hook(self, hook: Callable[[Mapping[str, HealthCheckResult]], None]):
+        """Register a callback run with the health snapshot after each routing reconfiguration"""
+        self._reconfig_hooks.append(hook)
+    
+    def set_interface_control_hook(self, hook: Optional[Callable[[str, str], None]]):
+        """Set the callback run after a successful manual interface control action"""
+        self._interface_control_hook = hook
     
     def _update_routing_tables(self, active_interfaces: List[str]):
         """Update system routing tables based on active interfaces"""
@@ -347,14 +530,18 @@ class HealthMonitor:
         
         iface_info['last_recovery_check'] = current_time
         
-        # Perform recovery test
+        # Perform recovery test on the side; counters only track regular checks
         self.logger.info(f"Testing recovery for interface {interface}")
-        
-        # Temporarily enable for testing
-        iface_info['enabled'] = True
-        health_result = self._check_interface_health(interface)
+        health_result = self._probe_once(interface)
         
         if health_result.status == HealthStatus.HEALTHY:
+            health_result.consecutive_failures = 0
+            with self._lock:
+                iface_info['consecutive_failures'] = 0
+                iface_info['enabled'] = True
+                self.health_results[interface] = health_result
+                self._publish_results()
+            
             self.logger.info(f"Interface {interface} has recovered!")
             
             # Log recovery event
@@ -366,8 +553,6 @@ class HealthMonitor:
             
             return True
         else:
-            # Still failed, disable again
-            iface_info['enabled'] = False
             self.logger.info(f"Interface {interface} still failed, will retry later")
             return False
     
@@ -393,8 +578,10 @@ class HealthMonitor:
     def _monitoring_loop(self):
         """Main monitoring loop"""
         self.logger.info("Health monitoring started")
+        fail_streak = 0
+        backoff = self.config['check_interval']
         
-        while self.monitoring_active:
+        while not self._stop.is_set():
             try:
                 # Check all interfaces
                 for interface in self.interfaces:
@@ -412,22 +599,43 @@ class HealthMonitor:
                     if self._should_trigger_failover(interface):
                         self._trigger_failover(interface)
                 
-                # Wait for next check interval
-                time.sleep(self.config['check_interval'])
+                fail_streak = 0
+                backoff = self.config['check_interval']
+                
+                # Wait for next check interval (returns early on stop)
+                if self._stop.wait(self.config['check_interval']):
+                    break
                 
             except Exception as e:
-                self.logger.error(f"Error in monitoring loop: {e}")
-                time.sleep(self.config['check_interval'])
+                # Back off exponentially so a persistent bug does not flood
+                # the logs, and give up entirely once it is clearly stuck
+                fail_streak += 1
+                backoff = min(backoff * 2, MAX_LOOP_BACKOFF)
+                self.logger.error(f"Error in monitoring loop ({fail_streak} in a row): {e}")
+                
+                if fail_streak > MAX_LOOP_FAILURES:
+                    self._log_event('CRASH', "Monitoring loop disabled after repeated failures",
+                                    {'failures': fail_streak, 'error': str(e)})
+                    self._stop.set()
+                    break
+                
+                if self._stop.wait(backoff):
+                    break
         
         self.logger.info("Health monitoring stopped")
     
+    @property
+    def monitoring_active(self) -> bool:
+        """Whether the monitoring loop is running"""
+        return not self._stop.is_set()
+    
     def start_monitoring(self):
         """Start health monitoring"""
         if self.monitoring_active:
             self.logger.warning("Monitoring already active")
             return
         
-        self.monitoring_active = True
+        self._stop.clear()
         self.monitor_thread = threading.Thread(target=self._monitoring_loop, daemon=True)
         self.monitor_thread.start()
         
@@ -439,7 +647,7 @@ class HealthMonitor:
         if not self.monitoring_active:
             return
         
-        self.monitoring_active = False
+        self._stop.set()
         
         if self.monitor_thread:
             self.monitor_thread.join(timeout=10)
@@ -447,16 +655,17 @@ class HealthMonitor:
         self.logger.info("Health monitoring stopped")
         self._log_event('STOP', "Health monitoring service stopped")
     
-    def get_health_status(self) -> Dict[str, HealthCheckResult]:
-        """Get current health status for all interfaces"""
-        return self.health_results.copy()
+    def get_health_status(self) -> Mapping[str, HealthCheckResult]:
+        """Get current health status for all interfaces (read-only snapshot)"""
+        return self._health_snapshot
     
     def get_interface_stats(self) -> Dict:
         """Get interface statistics"""
         stats = {}
+        snapshot = self._health_snapshot
         
         for interface, iface_info in self.interfaces.items():
-            health_result = self.health_results[interface]
+            health_result = snapshot[interface]
             
             stats[interface] = {
                 'enabled': iface_info['enabled'],
@@ -482,27 +691,27 @@ class HealthMonitor:
             return False
         
         if action == "disable":
-            self.interfaces[interface]['enabled'] = False
-            self.health_results[interface].status = HealthStatus.FAILED
+            self._set_status(interface, HealthStatus.FAILED, enabled=False)
             self._log_event('MANUAL_DISABLE', f"Interface {interface} manually disabled")
             self.logger.info(f"Manually disabled interface {interface}")
-            return True
         
         elif action == "enable":
-            self.interfaces[interface]['enabled'] = True
-            self.health_results[interface].status = HealthStatus.TESTING
+            self._set_status(interface, HealthStatus.TESTING, enabled=True)
             self._log_event('MANUAL_ENABLE', f"Interface {interface} manually enabled")
             self.logger.info(f"Manually enabled interface {interface}")
-            return True
         
         else:
             self.logger.error(f"Unknown action: {action}")
             return False
+        
+        if self._interface_control_hook:
+            self._interface_control_hook(interface, action)
+        return True
     
     def get_system_status(self) -> Dict:
         """Get overall system status"""
         healthy_interfaces = sum(
-            1 for result in self.health_results.values() 
+            1 for result in self._health_snapshot.values() 
             if result.status == HealthStatus.HEALTHY
         )
         
@@ -8,9 +8,19 @@ import sys
 import os
 import time
 import json
+import hashlib
 import logging
+import logging.handlers
+import queue
 import signal
-from typing import Dict, Optional
+import threading
+from functools import partial
+from typing import Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to stdlib json
+    orjson = None
 
 # Add the routing module to path
 sys.path.append('/opt/routeros/routing')
@@ -19,57 +29,292 @@ from health_monitor import HealthMonitor, HealthStatus
 from route_manager import RouteManager, InterfaceState
 from connection_tracker import ConnectionTracker
 
+def _dumps_status(status: Dict) -> bytes:
+    """Serialize status as indented JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(status, default=str,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(status, indent=2, default=str).encode()
+
+# Status fields that count towards the publish fingerprint
+_STABLE_HM_KEYS = ('monitoring_active', 'healthy_interfaces', 'total_interfaces',
+                   'system_health', 'config')
+_STABLE_ROUTING_KEYS = ('main_routes', 'all_routes', 'policy_rules')
+
+def _status_fingerprint(status: Dict) -> bytes:
+    """Digest of the status fields that warrant a republish
+    
+    Only health states, routes and config are covered. Check counters,
+    latencies, last-check times and uptimes move on every tick, so with
+    them in no two snapshots would ever match.
+    """
+    components = status.get('components', {})
+    hm_status = components.get('health_monitor', {})
+    rm_status = components.get('route_manager', {})
+    routing_info = rm_status.get('routing_info') or {}
+    stable = {
+        'overall_health': status.get('overall_health'),
+        'service_running': status.get('service_running'),
+        'health_monitor': {key: hm_status.get(key) for key in _STABLE_HM_KEYS},
+        'health': {name: (s['enabled'], s['current_status'], s['consecutive_failures'])
+                   for name, s in hm_status.get('interfaces', {}).items()},
+        'routes': {name: (s['state'], s['gateway'], s['weight'])
+                   for name, s in rm_status.get('interfaces', {}).items()},
+        'routing': {key: routing_info.get(key) for key in _STABLE_ROUTING_KEYS},
+    }
+    return hashlib.blake2b(_dumps_status(stable), digest_size=16).digest()
+
+def _loads(data: bytes):
+    """Parse JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+_SHUTDOWN_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+# Status snapshot for the web interface and tools. /run is tmpfs, so the
+# per-tick publish never touches disk, and it is writable under the
+# unit's ProtectSystem=strict sandbox.
+STATUS_FILE = '/run/routeros/status.json'
+LOG_FILE = '/var/log/routeros-watchdog.log'
+PID_FILE = '/var/run/routeros-watchdog.pid'
+# Unchanged status is only touched, but counters and latencies are still
+# republished at least this often (seconds)
+STATUS_MAX_AGE = 60
+
+# Periodic status log lines: all healthy, some down, none healthy
+_HEALTH_MSG = (
+    (logging.INFO, "All interfaces healthy (%d/%d)"),
+    (logging.WARNING, "WARNING: Some interfaces are down (%d/%d)"),
+    (logging.ERROR, "CRITICAL: No healthy interfaces available (%d/%d)"),
+)
+
+# Route manager state for each health status; anything else is TESTING
+_HEALTH_TO_IFACE = {
+    HealthStatus.HEALTHY: InterfaceState.UP,
+    HealthStatus.FAILED: InterfaceState.DOWN,
+}
+
+def _apply_health_to_routes(route_manager: RouteManager, health_status):
+    """Push health monitor results into the route manager's interface states"""
+    update = route_manager.update_interface_state
+    state_for = _HEALTH_TO_IFACE.get
+    testing = InterfaceState.TESTING
+    
+    for interface, health_result in health_status.items():
+        update(interface, state_for(health_result.status, testing),
+               health_result.latency, health_result.packet_loss)
+
+def _apply_interface_control(route_manager: RouteManager, interface: str, action: str):
+    """Push a manual enable/disable into the route manager's interface state"""
+    if action == "disable":
+        route_manager.update_interface_state(interface, InterfaceState.DOWN)
+    elif action == "enable":
+        route_manager.update_interface_state(interface, InterfaceState.UP)
+
+# Serializes control_interface() calls so route changes never interleave
+_control_lock = threading.Lock()
+
+def control_interface(interface: str, action: str) -> bool:
+    """Manually enable or disable an interface from another process
+    
+    In-process equivalent of --interface-control for callers such as the web
+    interface, safe to call from any thread. Builds only the route manager
+    and health monitor, neither of which installs signal handlers (the full
+    RouterOSWatchdog does). The route manager skips its startup route setup,
+    which belongs to the watchdog service; only the state change is applied.
+    
+    Both are built per call, like the subprocess this replaces, so WANs
+    added to the config since the caller started are known.
+    """
+    with _control_lock:
+        route_manager = RouteManager(initialize_routing=False)
+        health_monitor = HealthMonitor()
+        health_monitor.set_interface_control_hook(
+            partial(_apply_interface_control, route_manager))
+        return health_monitor.manual_interface_control(interface, action)
+
+class FastFormatter(logging.Formatter):
+    """Formatter that reuses the formatted timestamp within the same second"""
+    
+    def __init__(self, fmt=None, datefmt=None):
+        super().__init__(fmt, datefmt)
+        self._last_sec = None
+        self._last_str = ''
+    
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        
+        sec = int(record.created)
+        if sec != self._last_sec:
+            self._last_str = time.strftime(self.default_time_format, self.converter(sec))
+            self._last_sec = sec
+        return self.default_msec_format % (self._last_str, record.msecs)
+
+class BatchedFileHandler(logging.Handler):
+    """Log handler that coalesces records into a single write() per flush
+    
+    Records are staged in memory and written out when the buffer fills, when
+    a record at or above flush_level arrives, or every flush_interval seconds.
+    Each flush is also copied to mirror_fds (e.g. stderr), so one handler
+    formats every record once for both the log file and the console.
+    """
+    
+    def __init__(self, filename: str, capacity: int = 64 * 1024,
+                 flush_level: int = logging.WARNING, flush_interval: float = 1.0,
+                 mirror_fds: Tuple[int, ...] = ()):
+        super().__init__()
+        self.capacity = capacity
+        self.flush_level = flush_level
+        self.flush_interval = flush_interval
+        self._fd = os.open(filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        self._mirror_fds = mirror_fds
+        self._buffer = bytearray()
+        self._stop_flusher = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flusher.start()
+    
+    def emit(self, record):
+        try:
+            self._buffer += (self.format(record) + '\n').encode('utf-8')
+            if len(self._buffer) >= self.capacity or record.levelno >= self.flush_level:
+                self._write_buffer()
+        except Exception:
+            self.handleError(record)
+    
+    def _write_buffer(self):
+        """Write out staged records; caller must hold the handler lock"""
+        buffer = self._buffer
+        try:
+            data = memoryview(buffer)
+            while data:
+                data = data[os.write(self._fd, data):]
+            
+            for fd in self._mirror_fds:
+                data = memoryview(buffer)
+                try:
+                    while data:
+                        data = data[os.write(fd, data):]
+                except OSError:
+                    pass  # a closed console must not stop file logging
+        finally:
+            del data
+            buffer.clear()
+    
+    def flush(self):
+        self.acquire()
+        try:
+            if self._buffer and self._fd >= 0:
+                self._write_buffer()
+        except OSError:
+            pass  # nowhere left to report a failing log write
+        finally:
+            self.release()
+    
+    def _flush_loop(self):
+        while not self._stop_flusher.wait(self.flush_interval):
+            self.flush()
+    
+    def close(self):
+        self._stop_flusher.set()
+        self.flush()
+        self.acquire()
+        try:
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+        finally:
+            self.release()
+        super().close()
+
 class RouterOSWatchdog:
     """Main watchdog service that coordinates all components"""
     
     def __init__(self):
+        self._log_path = LOG_FILE
+        self._pid_file = PID_FILE
         self.logger = self._setup_logging()
         self.running = False
+        self._shutdown = threading.Event()
+        
+        # Reused by get_system_status; only leaf values change per tick
+        self._status_skel = {
+            'timestamp': 0.0,
+            'service_running': False,
+            'components': {},
+            'overall_health': 'unknown'
+        }
         
         # Initialize components
         self.route_manager: Optional[RouteManager] = None
         self.health_monitor: Optional[HealthMonitor] = None
         self.connection_tracker: Optional[ConnectionTracker] = None
         
+        # Status is published atomically: written to a sibling temp file,
+        # then renamed over the live file so readers never see partial JSON
+        self._status_file = STATUS_FILE
+        self._status_tmp = self._status_file + '.tmp'
+        self.status_fsync = False  # advisory state; durability not required
+        self._last_status_hash = b''
+        self._last_status_publish = 0.0  # monotonic time of the last rewrite
+        self._housekeep_q = queue.SimpleQueue()
+        self._housekeeper: Optional[threading.Thread] = None
+        try:
+            os.makedirs(os.path.dirname(self._status_file), exist_ok=True)
+        except OSError as e:
+            self.logger.warning(f"Cannot create status directory: {e}")
+        
         # Signal handlers
-        signal.signal(signal.SIGINT, self._signal_handler)
-        signal.signal(signal.SIGTERM, self._signal_handler)
+        for signum in _SHUTDOWN_SIGNALS:
+            signal.signal(signum, self._signal_handler)
         
         self.logger.info("RouterOS Watchdog initializing...")
     
     def _setup_logging(self) -> logging.Logger:
         """Setup comprehensive logging"""
         # Create logs directory if it doesn't exist
-        os.makedirs('/var/log', exist_ok=True)
+        os.makedirs(os.path.dirname(self._log_path), exist_ok=True)
         
         logger = logging.getLogger('routeros-watchdog')
         logger.setLevel(logging.INFO)
         
-        # File handler
-        file_handler = logging.FileHandler('/var/log/routeros-watchdog.log')
-        file_handler.setLevel(logging.INFO)
-        
-        # Console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
+        # Single handler for file and console (batched: one write() per
+        # flush instead of per record, mirrored to stderr)
+        try:
+            console_fds = (sys.stderr.fileno(),)
+        except (AttributeError, ValueError, OSError):
+            console_fds = ()
+        log_handler = BatchedFileHandler(self._log_path, mirror_fds=console_fds)
+        log_handler.setLevel(logging.INFO)
         
         # Formatter
-        formatter = logging.Formatter(
+        formatter = FastFormatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
         )
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
+        log_handler.setFormatter(formatter)
         
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+        # Callers only enqueue records; formatting and I/O happen on the
+        # listener thread so the service loop never blocks on log writes
+        log_queue = queue.SimpleQueue()
+        self._log_listener = logging.handlers.QueueListener(
+            log_queue, log_handler, respect_handler_level=True
+        )
+        self._log_listener.start()
+        self._log_listener_running = True
+        
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
         
         return logger
     
     def _signal_handler(self, signum, frame):
         """Handle shutdown signals"""
         self.logger.info(f"Received signal {signum}, shutting down...")
-        self.stop()
-        sys.exit(0)
+        if not self.running:
+            sys.exit(0)
+        
+        # Wake the service loop; it performs the shutdown on the main path
+        self._shutdown.set()
     
     def initialize_components(self):
         """Initialize all watchdog components"""
@@ -94,58 +339,19 @@ class RouterOSWatchdog:
     
     def _setup_component_integration(self):
         """Set up integration between components"""
-        # Override health monitor's routing update method to use our route manager
-        original_reconfigure_routing = self.health_monitor._reconfigure_routing
-        
-        def integrated_reconfigure_routing():
-            """Integrated routing reconfiguration"""
-            self.logger.info("Integrated routing reconfiguration triggered")
-            
-            # Get current interface states from health monitor
-            health_status = self.health_monitor.get_health_status()
-            
-            # Update route manager interface states
-            for interface, health_result in health_status.items():
-                if health_result.status == HealthStatus.HEALTHY:
-                    self.route_manager.update_interface_state(
-                        interface, InterfaceState.UP,
-                        health_result.latency, health_result.packet_loss
-                    )
-                elif health_result.status == HealthStatus.FAILED:
-                    self.route_manager.update_interface_state(
-                        interface, InterfaceState.DOWN,
-                        health_result.latency, health_result.packet_loss
-                    )
-                else:
-                    self.route_manager.update_interface_state(
-                        interface, InterfaceState.TESTING,
-                        health_result.latency, health_result.packet_loss
-                    )
-            
-            # Call original method for any additional processing
-            original_reconfigure_routing()
-        
-        self.health_monitor._reconfigure_routing = integrated_reconfigure_routing
-        
-        # Override manual interface control to sync between components
-        original_manual_control = self.health_monitor.manual_interface_control
-        
-        def integrated_manual_control(interface: str, action: str) -> bool:
-            """Integrated manual interface control"""
-            result = original_manual_control(interface, action)
-            
-            if result:
-                # Sync with route manager
-                if action == "disable":
-                    self.route_manager.update_interface_state(interface, InterfaceState.DOWN)
-                elif action == "enable":
-                    self.route_manager.update_interface_state(interface, InterfaceState.UP)
-                
-                self.logger.info(f"Integrated manual control: {interface} {action}")
-            
-            return result
+        self.health_monitor.add_reconfigure_hook(self._on_routing_reconfigured)
+        self.health_monitor.set_interface_control_hook(self._on_interface_control)
+    
+    def _on_routing_reconfigured(self, health_status):
+        """Sync route manager interface states after a health monitor reconfiguration"""
+        self.logger.info("Integrated routing reconfiguration triggered")
+        _apply_health_to_routes(self.route_manager, health_status)
+    
+    def _on_interface_control(self, interface: str, action: str):
+        """Sync route manager after a manual interface control action"""
+        _apply_interface_control(self.route_manager, interface, action)
         
-        self.health_monitor.manual_interface_control = integrated_manual_control
+        self.logger.info(f"Integrated manual control: {interface} {action}")
     
     def start(self):
         """Start the watchdog service"""
@@ -153,6 +359,10 @@ class RouterOSWatchdog:
             self.logger.warning("Watchdog service already running")
             return
         
+        if not self._log_listener_running:
+            self._log_listener.start()
+            self._log_listener_running = True
+        
         try:
             self.logger.info("Starting RouterOS Watchdog service...")
             
@@ -167,9 +377,13 @@ class RouterOSWatchdog:
             self.logger.info("RouterOS Watchdog service started successfully")
             
             # Create PID file
-            with open('/var/run/routeros-watchdog.pid', 'w') as f:
+            with open(self._pid_file, 'w') as f:
                 f.write(str(os.getpid()))
             
+            # Status publishing runs off the main loop at idle priority
+            self._housekeeper = threading.Thread(target=self._housekeeping_loop, daemon=True)
+            self._housekeeper.start()
+            
             # Main service loop
             self._service_loop()
             
@@ -186,18 +400,22 @@ class RouterOSWatchdog:
             try:
                 # Periodic health check and status reporting
                 self._periodic_health_check()
-                
-                # Sleep for a short interval
-                time.sleep(10)
+                delay = 10
                 
             except KeyboardInterrupt:
                 self.logger.info("Received keyboard interrupt")
                 break
             except Exception as e:
                 self.logger.error(f"Error in service loop: {e}")
-                time.sleep(5)
+                delay = 5
+            
+            # Wait for the next tick; a shutdown signal ends the wait at once
+            if self._shutdown.wait(delay):
+                break
         
         self.logger.info("Exiting main service loop")
+        if self._shutdown.is_set():
+            self.stop()
     
     def _periodic_health_check(self):
         """Perform periodic health checks and status reporting"""
@@ -206,15 +424,17 @@ class RouterOSWatchdog:
             system_status = self.get_system_status()
             
             # Log periodic status
-            healthy_count = system_status['health_monitor']['healthy_interfaces']
-            total_count = system_status['health_monitor']['total_interfaces']
+            hm_status = system_status['components']['health_monitor']
+            healthy_count = hm_status['healthy_interfaces']
+            total_count = hm_status['total_interfaces']
             
-            if healthy_count == 0:
-                self.logger.error(f"CRITICAL: No healthy interfaces available ({healthy_count}/{total_count})")
-            elif healthy_count < total_count:
-                self.logger.warning(f"WARNING: Some interfaces are down ({healthy_count}/{total_count})")
+            if healthy_count == total_count:
+                level, template = _HEALTH_MSG[0]
+            elif healthy_count > 0:
+                level, template = _HEALTH_MSG[1]
             else:
-                self.logger.info(f"All interfaces healthy ({healthy_count}/{total_count})")
+                level, template = _HEALTH_MSG[2]
+            self.logger.log(level, template, healthy_count, total_count)
             
             # Write status to file for web interface
             self._write_status_file(system_status)
@@ -223,17 +443,68 @@ class RouterOSWatchdog:
             self.logger.error(f"Error in periodic health check: {e}")
     
     def _write_status_file(self, status: Dict):
-        """Write system status to file for web interface"""
+        """Queue a status publish for the web interface
+        
+        The snapshot is serialized here, since status is reused next tick;
+        the file I/O runs on the idle-priority housekeeping thread.
+        """
         try:
-            status_file = '/opt/routeros/web/status.json'
-            os.makedirs(os.path.dirname(status_file), exist_ok=True)
+            # Skip the publish while health, routes and config are unchanged;
+            # just touch the file so readers can still see the watchdog is alive
+            digest = _status_fingerprint(status)
+            fresh = time.monotonic() - self._last_status_publish < STATUS_MAX_AGE
+            
+            if digest == self._last_status_hash and fresh:
+                self._housekeep_q.put(self._touch_status_file)
+            else:
+                self._housekeep_q.put(partial(self._publish_status, _dumps_status(status), digest))
             
-            with open(status_file, 'w') as f:
-                json.dump(status, f, indent=2, default=str)
-                
         except Exception as e:
             self.logger.error(f"Failed to write status file: {e}")
     
+    def _touch_status_file(self):
+        """Bump the status file mtime without rewriting it"""
+        try:
+            os.utime(self._status_file, None)
+        except FileNotFoundError:
+            self._last_status_hash = b''  # removed externally; rewrite next tick
+    
+    def _publish_status(self, payload: bytes, digest: bytes):
+        """Atomically replace the status file with payload"""
+        # The temp file is reopened every tick on purpose: after the rename
+        # a kept-open descriptor would point at the live status.json
+        payload = memoryview(payload)
+        fd = os.open(self._status_tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while payload:
+                payload = payload[os.write(fd, payload):]
+            if self.status_fsync:
+                os.fdatasync(fd)
+        finally:
+            os.close(fd)
+        
+        os.replace(self._status_tmp, self._status_file)
+        self._last_status_hash = digest
+        self._last_status_publish = time.monotonic()
+    
+    def _housekeeping_loop(self):
+        """Run queued best-effort I/O at idle CPU and I/O priority"""
+        try:
+            # SCHED_IDLE also puts the thread in the idle I/O class; pid 0
+            # applies to the calling thread only
+            os.sched_setscheduler(0, os.SCHED_IDLE, os.sched_param(0))
+        except (AttributeError, OSError) as e:
+            self.logger.warning(f"Could not lower housekeeping priority: {e}")
+        
+        while True:
+            task = self._housekeep_q.get()
+            if task is None:
+                break
+            try:
+                task()
+            except Exception as e:
+                self.logger.error(f"Housekeeping task failed: {e}")
+    
     def stop(self):
         """Stop the watchdog service"""
         if not self.running:
@@ -246,46 +517,60 @@ class RouterOSWatchdog:
         if self.health_monitor:
             self.health_monitor.stop_monitoring()
         
+        # Let queued housekeeping finish
+        if self._housekeeper:
+            self._housekeep_q.put(None)
+            self._housekeeper.join(timeout=10)
+            self._housekeeper = None
+        
         # Remove PID file
         try:
-            os.remove('/var/run/routeros-watchdog.pid')
+            os.remove(self._pid_file)
         except FileNotFoundError:
             pass
         
         self.logger.info("RouterOS Watchdog service stopped")
+        
+        # Drain queued records to the handlers before exiting
+        if self._log_listener_running:
+            self._log_listener.stop()
+            self._log_listener_running = False
     
     def get_system_status(self) -> Dict:
-        """Get comprehensive system status"""
-        status = {
-            'timestamp': time.time(),
-            'service_running': self.running,
-            'components': {}
-        }
+        """Get comprehensive system status
+        
+        The returned dict is reused between calls; only its leaf values are
+        refreshed. Copy it if it must outlive the next call.
+        """
+        status = self._status_skel
+        status['timestamp'] = time.time()
+        status['service_running'] = self.running
+        components = status['components']
         
         # Health monitor status
         if self.health_monitor:
-            status['components']['health_monitor'] = self.health_monitor.get_system_status()
-            status['components']['health_monitor']['interfaces'] = self.health_monitor.get_interface_stats()
+            hm_status = self._component_status('health_monitor')
+            hm_status.clear()
+            hm_status.update(self.health_monitor.get_system_status())
+            hm_status['interfaces'] = self.health_monitor.get_interface_stats()
         
         # Route manager status
         if self.route_manager:
-            status['components']['route_manager'] = {
-                'interfaces': self.route_manager.get_interface_stats(),
-                'routing_info': self.route_manager.get_routing_info()
-            }
+            rm_status = self._component_status('route_manager')
+            rm_status['interfaces'] = self.route_manager.get_interface_stats()
+            rm_status['routing_info'] = self.route_manager.get_routing_info()
         
         # Connection tracker status
         if self.connection_tracker:
-            status['components']['connection_tracker'] = {
-                'stats': self.connection_tracker.get_connection_stats(),
-                'active_connections': len(self.connection_tracker.get_active_connections()),
-                'sticky_sessions': len(self.connection_tracker.sticky_sessions)
-            }
+            ct_status = self._component_status('connection_tracker')
+            ct_status['stats'] = self.connection_tracker.get_connection_stats()
+            ct_status['active_connections'] = len(self.connection_tracker.get_active_connections())
+            ct_status['sticky_sessions'] = len(self.connection_tracker.sticky_sessions)
         
         # Overall system health
         if self.health_monitor:
-            healthy_interfaces = status['components']['health_monitor']['healthy_interfaces']
-            total_interfaces = status['components']['health_monitor']['total_interfaces']
+            healthy_interfaces = components['health_monitor']['healthy_interfaces']
+            total_interfaces = components['health_monitor']['total_interfaces']
             
             if healthy_interfaces == total_interfaces:
                 status['overall_health'] = 'healthy'
@@ -298,6 +583,14 @@ class RouterOSWatchdog:
         
         return status
     
+    def _component_status(self, name: str) -> Dict:
+        """Return the reusable status sub-dict for a component, creating it once"""
+        components = self._status_skel['components']
+        component_status = components.get(name)
+        if component_status is None:
+            component_status = components[name] = {}
+        return component_status
+    
     def manual_interface_control(self, interface: str, action: str) -> bool:
         """Manual control of interface through health monitor"""
         if not self.health_monitor:
@@ -309,9 +602,18 @@ class RouterOSWatchdog:
     def get_logs(self, lines: int = 100) -> str:
         """Get recent log entries"""
         try:
-            with open('/var/log/routeros-watchdog.log', 'r') as f:
-                log_lines = f.readlines()
-                return ''.join(log_lines[-lines:])
+            # Read backwards from the end in blocks until enough lines are found
+            with open(self._log_path, 'rb') as f:
+                pos = f.seek(0, os.SEEK_END)
+                buf = bytearray()
+                while pos > 0 and buf.count(b'\n') <= lines:
+                    step = min(8192, pos)
+                    pos -= step
+                    f.seek(pos)
+                    buf[:0] = f.read(step)
+            
+            tail = buf.splitlines(keepends=True)[-lines:] if lines > 0 else []
+            return b''.join(tail).decode('utf-8', 'replace')
         except Exception as e:
             return f"Failed to read logs: {e}"
 
@@ -353,9 +655,9 @@ def main():
     if args.status:
         # Show status and exit
         try:
-            with open('/opt/routeros/web/status.json', 'r') as f:
-                status = json.load(f)
-                print(json.dumps(status, indent=2))
+            with open(STATUS_FILE, 'rb') as f:
+                status = _loads(f.read())
+                print(_dumps_status(status).decode())
         except Exception as e:
             print(f"Failed to get status: {e}")
         return
@@ -378,6 +680,30 @@ def main():
         print("✓ System status retrieved successfully")
         print(f"Overall health: {status.get('overall_health', 'unknown')}")
         
+        # Test the publish skip: consecutive steady-state snapshots must
+        # fingerprint alike, or every tick rewrites the status file
+        digest = _status_fingerprint(status)
+        time.sleep(0.01)
+        if _status_fingerprint(watchdog.get_system_status()) == digest:
+            print("✓ Steady-state status fingerprint is stable")
+        else:
+            print("✗ Status fingerprint changed between steady-state ticks")
+        
+        # Test status publishing: one service tick, with the queued
+        # housekeeping run inline, must leave a fresh status file behind
+        started = time.time()
+        watchdog._periodic_health_check()
+        while not watchdog._housekeep_q.empty():
+            watchdog._housekeep_q.get()()
+        try:
+            published = os.stat(STATUS_FILE).st_mtime >= started - 1
+        except OSError:
+            published = False
+        if published:
+            print(f"✓ Status published to {STATUS_FILE}")
+        else:
+            print(f"✗ Status was not published to {STATUS_FILE}")
+        
         return
     
     # Run as service
@@ -4,21 +4,56 @@ Smart Multi-WAN Router OS - Web Management Dashboard
 Provides real-time monitoring, configuration management, and manual controls
 """
 
-from flask import Flask, render_template, jsonify, request, send_from_directory
-import json
+from flask import Flask, jsonify, request, send_from_directory
 import os
 import time
 import logging
 import subprocess
+import heapq
+import gzip
+import shutil
+import zlib
+import threading
 from datetime import datetime
-from threading import Lock
+from functools import lru_cache
+from operator import itemgetter
+from types import MappingProxyType
+from typing import List, Optional, Tuple
+from json_provider import ORJSONProvider
+
+try:
+    from pystemd.systemd1 import Manager as SystemdManager, Unit as SystemdUnit
+except ImportError:  # optional; fall back to the systemctl binary
+    SystemdManager = None
+
+try:
+    import psutil
+except ImportError:  # fall back to parsing /proc/net/dev
+    psutil = None
+
+try:
+    import inotify_simple
+except ImportError:  # optional; fall back to a stat() per request
+    inotify_simple = None
+
+WATCHDOG_UNIT = b'routeros-watchdog.service'
+_SYSTEMD_JOB_METHODS = {'start': 'StartUnit', 'stop': 'StopUnit', 'restart': 'RestartUnit'}
+
+SYSTEMCTL = shutil.which('systemctl') or '/usr/bin/systemctl'
+# Job actions use --no-block: systemctl returns once the job is queued
+# (like the D-Bus path), so a slow unit start never pins a server thread
+_SYSTEMCTL_ARGS = {
+    'status': (SYSTEMCTL, 'is-active', 'routeros-watchdog'),
+    'start': (SYSTEMCTL, '--no-block', 'start', 'routeros-watchdog'),
+    'stop': (SYSTEMCTL, '--no-block', 'stop', 'routeros-watchdog'),
+    'restart': (SYSTEMCTL, '--no-block', 'restart', 'routeros-watchdog')
+}
+SYSTEMCTL_TIMEOUT = 15  # seconds
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 app.config['SECRET_KEY'] = 'routeros-secret-key-change-in-production'
 
-# Global lock for thread safety
-status_lock = Lock()
-
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,79 +65,261 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+WEB_VERSION = '1.0.0'
+DASHBOARD_TEMPLATE = os.path.join(app.root_path, 'templates', 'dashboard.html')
+
+# Served when interfaces.json does not exist yet
+_DEFAULT_CONFIG = MappingProxyType({
+    'wan_interfaces': (
+        {'name': 'eth0', 'gateway': '192.168.100.1', 'weight': 2, 'dns': ['8.8.8.8']},
+        {'name': 'eth1', 'gateway': '192.168.200.1', 'weight': 1, 'dns': ['1.1.1.1']}
+    )
+})
+
+LOG_FILES = (
+    '/var/log/routeros-watchdog.log',
+    '/var/log/routeros-health.log',
+    '/var/log/routeros-routing.log'
+)
+LOG_LINE_BUCKET = 50
+NET_STATS_TTL = 0.5  # seconds
+
+def tail_lines(path: str, n: int) -> List[str]:
+    """Return the last n lines of a file, reading backwards from the end"""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = bytearray()
+        while pos > 0 and buf.count(b'\n') <= n:
+            step = min(8192, pos)
+            pos -= step
+            f.seek(pos)
+            buf[:0] = f.read(step)
+    
+    return buf.decode('utf-8', 'replace').splitlines()[-n:] if n > 0 else []
+
+@lru_cache(maxsize=1)
+def _iso_now(second: int) -> str:
+    """ISO timestamp for a whole second; reformatted only when the second changes"""
+    return datetime.fromtimestamp(second).isoformat()
+
+@lru_cache(maxsize=8)
+def _merged_log_tail(log_files: Tuple[Tuple[str, str], ...], per_file: int,
+                     _second: int) -> Tuple[Tuple[str, str], ...]:
+    """Tail each log and merge them in timestamp order (cached per second)
+    
+    log_files holds (path, display name) pairs; returns (name, line) pairs.
+    """
+    sources = []
+    for log_file, name in log_files:
+        try:
+            sources.append([(name, line.strip()) for line in tail_lines(log_file, per_file)])
+        except FileNotFoundError:
+            continue
+        except Exception as e:
+            sources.append([(name, f"Error reading {log_file}: {e}")])
+    
+    # Each file is already chronological; merge on the timestamp-led text
+    return tuple(heapq.merge(*sources, key=itemgetter(1)))
+
 class RouterOSWebInterface:
     """Web interface for RouterOS management"""
     
     def __init__(self):
-        self.status_file = '/opt/routeros/web/status.json'
+        self.status_file = '/run/routeros/status.json'
         self.config_file = '/opt/routeros/config/interfaces.json'
         self.watchdog_script = '/opt/routeros/watchdog/watchdog_service.py'
-        self.status_cache = {}
-        self.cache_timestamp = 0
-        self.cache_duration = 5  # seconds
+        self._systemd = None  # pystemd Manager, connected on first use
+        self._net_stats_cache = None  # (monotonic time, stats)
+        self._log_files = tuple((path, os.path.basename(path)) for path in LOG_FILES)
+        
+        # Parsed files are cached as (mtime_ns, value) until the file changes;
+        # the lock only serializes re-reads, never cache hits. Status entries
+        # are also keyed on the second, see _current_status()
+        self._status_cached = (None, ({}, b'{}', None, None))
+        self._status_parsed = (None, None)  # (mtime_ns, parsed status.json)
+        self._config_cached = (None, None)
+        self._rebuild_lock = threading.Lock()
+        
+        # Set once an inotify watch keeps the matching cache current
+        self._status_watched = False
+        self._config_watched = False
+        if inotify_simple is not None:
+            self._start_file_watcher()
+        
+    def _start_file_watcher(self):
+        """Refresh cached files on inotify events instead of stat-ing per request"""
+        flags = inotify_simple.flags
+        inotify = inotify_simple.INotify()
+        handlers = {}
+        
+        for path, refresh, attr in ((self.status_file, self._refresh_status, '_status_watched'),
+                                    (self.config_file, self._refresh_config, '_config_watched')):
+            directory, name = os.path.split(path)
+            try:
+                # ATTRIB: the watchdog only touches status.json while it is unchanged
+                wd = inotify.add_watch(directory, flags.CLOSE_WRITE | flags.MOVED_TO | flags.ATTRIB)
+            except OSError as e:
+                logger.warning(f"Cannot watch {directory}, checking {name} per request: {e}")
+                continue
+            handlers[(wd, name)] = refresh
+            refresh()
+            setattr(self, attr, True)
+        
+        if not handlers:
+            inotify.close()
+            return
+        
+        def watch():
+            while True:
+                for event in inotify.read():
+                    refresh = handlers.get((event.wd, event.name))
+                    if refresh:
+                        try:
+                            refresh()
+                        except Exception as e:
+                            logger.error(f"Failed to refresh {event.name}: {e}")
         
+        threading.Thread(target=watch, daemon=True, name='file-watcher').start()
+    
+    def _refresh_status(self):
+        """Re-read status.json into the cache"""
+        self._status_parsed = (None, None)
+        self._status_cached = (None, self._status_cached[1])
+        self._current_status()
+    
+    def _refresh_config(self):
+        """Re-read interfaces.json into the cache"""
+        self._config_cached = (None, self._config_cached[1])
+        self.get_interface_config()
+    
     def get_system_status(self) -> dict:
-        """Get current system status with caching"""
+        """Get current system status, re-reading status.json only when it changes"""
+        return self._current_status()[0].copy()
+    
+    def get_system_status_bytes(self) -> bytes:
+        """Get current system status as serialized JSON for API responses"""
+        return self._current_status()[1]
+    
+    def get_system_status_payload(self) -> Tuple[bytes, Optional[str], Optional[bytes]]:
+        """Get serialized system status, its ETag and gzipped form
+        
+        The ETag and gzipped body are None when the status is not cached.
+        """
+        return self._current_status()[1:]
+    
+    def _current_status(self) -> tuple:
+        """Return (status, serialized, etag, gzipped), refreshing the cache on change
+        
+        Entries are keyed on status.json's mtime and the current second, so
+        the web_interface uptime and last_update keep moving between writes.
+        """
+        # The cache is a single ((mtime_ns, second), entry) tuple replaced as
+        # a whole, so readers take one reference and never need a lock
+        cached = self._status_cached
         current_time = time.time()
+        second = int(current_time)
         
-        with status_lock:
-            if current_time - self.cache_timestamp < self.cache_duration:
-                return self.status_cache.copy()
+        # With a live watch the file is known unchanged; skip the stat()
+        if self._status_watched and cached[0] is not None and cached[0][1] == second:
+            return cached[1]
         
         try:
-            # Read status from watchdog service
-            if os.path.exists(self.status_file):
-                with open(self.status_file, 'r') as f:
-                    status = json.load(f)
-            else:
-                # Fallback status if watchdog hasn't created file yet
-                status = {
-                    'timestamp': current_time,
-                    'overall_health': 'unknown',
-                    'service_running': False,
-                    'components': {}
-                }
-            
-            # Add web interface specific data
-            status['web_interface'] = {
-                'version': '1.0.0',
-                'uptime': current_time - getattr(self, 'start_time', current_time),
-                'last_update': datetime.now().isoformat()
-            }
+            try:
+                mtime = os.stat(self.status_file).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
             
-            # Cache the result
-            with status_lock:
-                self.status_cache = status.copy()
-                self.cache_timestamp = current_time
+            key = (mtime, second)
+            if mtime is not None and key == cached[0]:
+                return cached[1]
             
-            return status
+            with self._rebuild_lock:
+                # Another request may have rebuilt it while we waited
+                cached = self._status_cached
+                if mtime is not None and key == cached[0]:
+                    return cached[1]
+                
+                # Read status from watchdog service, only when it changed
+                if mtime is not None:
+                    parsed_mtime, file_status = self._status_parsed
+                    if parsed_mtime != mtime:
+                        with open(self.status_file, 'rb') as f:
+                            file_status = app.json.loads(f.read())
+                        # An unchanged status is only touched; its mtime is
+                        # the watchdog's last tick
+                        file_status['timestamp'] = mtime / 1e9
+                        self._status_parsed = (mtime, file_status)
+                    # Shallow copy: the parsed file is shared between entries
+                    status = dict(file_status)
+                else:
+                    # Fallback status if watchdog hasn't created file yet
+                    status = {
+                        'timestamp': current_time,
+                        'overall_health': 'unknown',
+                        'service_running': False,
+                        'components': {}
+                    }
+                
+                # Add web interface specific data
+                status['web_interface'] = {
+                    'version': WEB_VERSION,
+                    'uptime': current_time - getattr(self, 'start_time', current_time),
+                    'last_update': _iso_now(second)
+                }
+                
+                # Serialize once; cache hits hand out the same bytes. The key
+                # doubles as the ETag since it changes with the content
+                etag = f"{mtime:x}-{second:x}" if mtime is not None else None
+                blob = app.json.dumps_bytes(status)
+                if mtime is not None:
+                    # Compress once per entry rather than once per request
+                    entry = (status, blob, etag, gzip.compress(blob, compresslevel=1))
+                    self._status_cached = (key, entry)
+                else:
+                    entry = (status, blob, None, None)
+                
+                return entry
             
         except Exception as e:
             logger.error(f"Failed to get system status: {e}")
-            return {
+            status = {
                 'timestamp': current_time,
                 'overall_health': 'error',
                 'error': str(e),
                 'web_interface': {
-                    'version': '1.0.0',
-                    'last_update': datetime.now().isoformat()
+                    'version': WEB_VERSION,
+                    'last_update': _iso_now(int(current_time))
                 }
             }
+            return status, app.json.dumps_bytes(status), None, None
     
     def get_interface_config(self) -> dict:
         """Get interface configuration"""
+        cached = self._config_cached
+        if self._config_watched and cached[0] is not None:
+            return cached[1].copy()
+        
         try:
-            if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
+            try:
+                mtime = os.stat(self.config_file).st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            
+            if mtime is not None:
+                if mtime == cached[0]:
+                    return cached[1].copy()
+                
+                with self._rebuild_lock:
+                    cached = self._config_cached
+                    if mtime == cached[0]:
+                        return cached[1].copy()
+                    
+                    with open(self.config_file, 'rb') as f:
+                        config = app.json.loads(f.read())
+                    self._config_cached = (mtime, config)
+                    return config.copy()
             else:
-                # Default configuration
-                return {
-                    'wan_interfaces': [
-                        {'name': 'eth0', 'gateway': '192.168.100.1', 'weight': 2, 'dns': ['8.8.8.8']},
-                        {'name': 'eth1', 'gateway': '192.168.200.1', 'weight': 1, 'dns': ['1.1.1.1']}
-                    ]
-                }
+                return dict(_DEFAULT_CONFIG)
         except Exception as e:
             logger.error(f"Failed to get interface config: {e}")
             return {'error': str(e)}
@@ -111,8 +328,20 @@ class RouterOSWebInterface:
         """Save interface configuration"""
         try:
             os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
+            
+            # Write a temp file and rename it over the config, so a crash or
+            # a concurrent reader never sees a half-written file
+            data = memoryview(app.json.dumps_bytes(config, indent=True))
+            tmp_file = self.config_file + '.tmp'
+            fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+            try:
+                while data:
+                    data = data[os.write(fd, data):]
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            
+            os.replace(tmp_file, self.config_file)
             return True
         except Exception as e:
             logger.error(f"Failed to save interface config: {e}")
@@ -120,35 +349,48 @@ class RouterOSWebInterface:
     
     def control_watchdog_service(self, action: str) -> dict:
         """Control the watchdog service"""
+        if SystemdManager is not None and (action == 'status' or action in _SYSTEMD_JOB_METHODS):
+            try:
+                return self._control_watchdog_dbus(action)
+            except Exception as e:
+                logger.warning(f"D-Bus control of watchdog failed, using systemctl: {e}")
+        
+        argv = _SYSTEMCTL_ARGS.get(action)
+        if argv is None:
+            return {'error': f'Unknown action: {action}'}
+        
         try:
+            # Fixed absolute argv; close_fds=False lets subprocess use posix_spawn
+            result = subprocess.run(argv, capture_output=True, text=True, close_fds=False,
+                                    timeout=SYSTEMCTL_TIMEOUT)
+            
             if action == 'status':
-                # Check if service is running
-                result = subprocess.run(['systemctl', 'is-active', 'routeros-watchdog'], 
-                                      capture_output=True, text=True)
                 return {'status': result.stdout.strip(), 'running': result.returncode == 0}
+            return {'success': result.returncode == 0, 'message': result.stdout or result.stderr}
             
-            elif action == 'start':
-                result = subprocess.run(['systemctl', 'start', 'routeros-watchdog'], 
-                                      capture_output=True, text=True)
-                return {'success': result.returncode == 0, 'message': result.stdout or result.stderr}
-            
-            elif action == 'stop':
-                result = subprocess.run(['systemctl', 'stop', 'routeros-watchdog'], 
-                                      capture_output=True, text=True)
-                return {'success': result.returncode == 0, 'message': result.stdout or result.stderr}
-            
-            elif action == 'restart':
-                result = subprocess.run(['systemctl', 'restart', 'routeros-watchdog'], 
-                                      capture_output=True, text=True)
-                return {'success': result.returncode == 0, 'message': result.stdout or result.stderr}
-            
-            else:
-                return {'error': f'Unknown action: {action}'}
-                
+        except subprocess.TimeoutExpired:
+            logger.error(f"systemctl {action} timed out after {SYSTEMCTL_TIMEOUT}s")
+            return {'error': f'systemctl {action} timed out'}
         except Exception as e:
             logger.error(f"Failed to control watchdog service: {e}")
             return {'error': str(e)}
     
+    def _control_watchdog_dbus(self, action: str) -> dict:
+        """Control the watchdog unit through systemd's D-Bus API"""
+        if action == 'status':
+            unit = SystemdUnit(WATCHDOG_UNIT)
+            unit.load()
+            state = unit.Unit.ActiveState.decode()
+            return {'status': state, 'running': state == 'active'}
+        
+        if self._systemd is None:
+            manager = SystemdManager()
+            manager.load()
+            self._systemd = manager
+        
+        job = getattr(self._systemd.Manager, _SYSTEMD_JOB_METHODS[action])(WATCHDOG_UNIT, b'replace')
+        return {'success': True, 'message': f"{action} job queued: {job.decode()}"}
+    
     def control_interface(self, interface: str, action: str) -> dict:
         """Control individual interface"""
         try:
@@ -168,64 +410,70 @@ class RouterOSWebInterface:
     def get_system_logs(self, lines: int = 100) -> str:
         """Get system logs"""
         try:
-            log_files = [
-                '/var/log/routeros-watchdog.log',
-                '/var/log/routeros-health.log',
-                '/var/log/routeros-routing.log'
-            ]
-            
-            logs = []
-            for log_file in log_files:
-                if os.path.exists(log_file):
-                    try:
-                        with open(log_file, 'r') as f:
-                            file_logs = f.readlines()
-                            logs.extend([f"[{os.path.basename(log_file)}] {line.strip()}" 
-                                       for line in file_logs[-lines//len(log_files):]])
-                    except Exception as e:
-                        logs.append(f"Error reading {log_file}: {e}")
-            
-            # Sort by timestamp and limit lines
-            logs.sort()
-            return '\n'.join(logs[-lines:]) if logs else "No logs available"
+            logs = self.get_log_entries(lines)
+            return '\n'.join(f"[{src}] {line}" for src, line in logs) if logs else "No logs available"
             
         except Exception as e:
             logger.error(f"Failed to get system logs: {e}")
             return f"Error retrieving logs: {e}"
     
+    def get_log_entries(self, lines: int = 100) -> Tuple[Tuple[str, str], ...]:
+        """Get the most recent (source, line) log entries across all log files"""
+        # Round up to a bucket so the dashboard's polls share cache entries
+        bucket = -(-max(lines, 1) // LOG_LINE_BUCKET) * LOG_LINE_BUCKET
+        logs = _merged_log_tail(self._log_files, bucket // len(self._log_files), int(time.monotonic()))
+        return logs[-lines:]
+    
     def get_network_statistics(self) -> dict:
         """Get network interface statistics"""
+        now = time.monotonic()
+        cached = self._net_stats_cache
+        if cached and now - cached[0] < NET_STATS_TTL:
+            return cached[1]
+        
         try:
-            # Get interface statistics using ip command
-            result = subprocess.run(['ip', '-s', 'link'], capture_output=True, text=True)
-            if result.returncode != 0:
-                return {'error': 'Failed to get interface statistics'}
+            if psutil is not None:
+                interfaces = {
+                    nic: {
+                        'rx_bytes': c.bytes_recv,
+                        'rx_packets': c.packets_recv,
+                        'rx_errors': c.errin,
+                        'rx_dropped': c.dropin,
+                        'tx_bytes': c.bytes_sent,
+                        'tx_packets': c.packets_sent,
+                        'tx_errors': c.errout,
+                        'tx_dropped': c.dropout
+                    }
+                    for nic, c in psutil.net_io_counters(pernic=True).items()
+                }
+                stats = {'interfaces': interfaces}
+                self._net_stats_cache = (now, stats)
+                return stats
             
-            # Parse the output (simplified parsing)
-            interfaces = {}
-            lines = result.stdout.strip().split('\n')
-            current_iface = None
+            # Kernel counters straight from /proc; no ip(8) fork or text parsing
+            with open('/proc/net/dev', 'rb') as f:
+                data = f.read()
             
-            for line in lines:
-                if line.startswith(':'):
-                    parts = line.split(':')
-                    if len(parts) >= 3:
-                        current_iface = parts[1].strip()
-                        interfaces[current_iface] = {'status': parts[2].strip()}
-                elif current_iface and line.strip():
-                    # This is statistics line - simplified parsing
-                    if 'RX:' in line or 'TX:' in line:
-                        continue
-                    stats = line.strip().split()
-                    if len(stats) >= 2 and current_iface in interfaces:
-                        if 'rx_bytes' not in interfaces[current_iface]:
-                            interfaces[current_iface]['rx_bytes'] = stats[0]
-                            interfaces[current_iface]['rx_packets'] = stats[1]
-                        else:
-                            interfaces[current_iface]['tx_bytes'] = stats[0]
-                            interfaces[current_iface]['tx_packets'] = stats[1]
+            interfaces = {}
+            for line in data.splitlines()[2:]:
+                name, _, counters = line.partition(b':')
+                fields = counters.split()
+                if len(fields) < 16:
+                    continue
+                interfaces[name.strip().decode()] = {
+                    'rx_bytes': int(fields[0]),
+                    'rx_packets': int(fields[1]),
+                    'rx_errors': int(fields[2]),
+                    'rx_dropped': int(fields[3]),
+                    'tx_bytes': int(fields[8]),
+                    'tx_packets': int(fields[9]),
+                    'tx_errors': int(fields[10]),
+                    'tx_dropped': int(fields[11])
+                }
             
-            return {'interfaces': interfaces}
+            stats = {'interfaces': interfaces}
+            self._net_stats_cache = (now, stats)
+            return stats
             
         except Exception as e:
             logger.error(f"Failed to get network statistics: {e}")
@@ -235,20 +483,46 @@ class RouterOSWebInterface:
 web_interface = RouterOSWebInterface()
 web_interface.start_time = time.time()
 
+def _conditional_json(body: bytes, etag: Optional[str] = None):
+    """JSON response with a weak ETag, answered with 304 when the client has it"""
+    response = app.response_class(body, mimetype='application/json')
+    response.set_etag(etag or f"{zlib.adler32(body):x}-{len(body):x}", weak=True)
+    return response.make_conditional(request)
+
+@lru_cache(maxsize=1)
+def _dashboard_page() -> Tuple[bytes, str]:
+    """Load the dashboard page from templates/ once, with its ETag"""
+    with open(DASHBOARD_TEMPLATE, 'rb') as f:
+        body = f.read()
+    return body, f"{zlib.adler32(body):x}-{len(body):x}"
+
 @app.route('/')
 def dashboard():
-    """Main dashboard page"""
-    return render_template('dashboard.html')
+    """Main dashboard page (plain HTML; nothing to render)"""
+    body, etag = _dashboard_page()
+    response = app.response_class(body, mimetype='text/html')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 3600
+    return response.make_conditional(request)
 
 @app.route('/api/status')
 def api_status():
     """API endpoint for system status"""
-    return jsonify(web_interface.get_system_status())
+    blob, etag, blob_gz = web_interface.get_system_status_payload()
+    if blob_gz is None or not request.accept_encodings['gzip']:
+        response = _conditional_json(blob, etag)
+    else:
+        response = _conditional_json(blob_gz, etag)
+        if response.status_code == 200:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
 
 @app.route('/api/interfaces')
 def api_interfaces():
     """API endpoint for interface configuration"""
-    return jsonify(web_interface.get_interface_config())
+    return _conditional_json(app.json.dumps_bytes(web_interface.get_interface_config()))
 
 @app.route('/api/interfaces', methods=['POST'])
 def api_save_interfaces():
@@ -274,15 +548,35 @@ def api_interface_control(interface, action):
 
 @app.route('/api/logs')
 def api_logs():
-    """API endpoint for system logs"""
+    """API endpoint for system logs
+    
+    Clients that accept application/x-ndjson get one JSON object per log
+    line, streamed as it is encoded; others get the joined text as before.
+    """
     lines = request.args.get('lines', 100, type=int)
+    
+    if 'application/x-ndjson' in request.headers.get('Accept', ''):
+        try:
+            entries = web_interface.get_log_entries(lines)
+        except Exception as e:
+            logger.error(f"Failed to get system logs: {e}")
+            return jsonify({'error': str(e)}), 500
+        
+        dumps = app.json.dumps_bytes
+        
+        def generate():
+            for src, line in entries:
+                yield dumps({'src': src, 'line': line}) + b'\n'
+        
+        return app.response_class(generate(), mimetype='application/x-ndjson')
+    
     logs = web_interface.get_system_logs(lines)
     return jsonify({'logs': logs})
 
 @app.route('/api/network-stats')
 def api_network_stats():
     """API endpoint for network statistics"""
-    return jsonify(web_interface.get_network_statistics())
+    return _conditional_json(app.json.dumps_bytes(web_interface.get_network_statistics()))
 
 @app.route('/static/<path:filename>')
 def static_files(filename):
@@ -311,165 +605,20 @@ def main():
     
     logger.info(f"Starting RouterOS Web Interface on {args.host}:{args.port}")
     
-    # Create template directory if it doesn't exist
-    os.makedirs('templates', exist_ok=True)
+    if args.debug:
+        app.run(host=args.host, port=args.port, debug=True)
+        return
     
-    # Create a simple template if it doesn't exist
-    template_path = 'templates/dashboard.html'
-    if not os.path.exists(template_path):
-        with open(template_path, 'w') as f:
-            f.write('''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>RouterOS Dashboard</title>
-    <style>
-        body { font-family: Arial, sans-serif; margin: 20px; background-color: #f5f5f5; }
-        .container { max-width: 1200px; margin: 0 auto; }
-        .header { background: #333; color: white; padding: 20px; border-radius: 5px; margin-bottom: 20px; }
-        .card { background: white; border-radius: 5px; padding: 20px; margin-bottom: 20px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); }
-        .status-grid { display: grid; grid-template-columns: repeat(auto-fit, minmax(300px, 1fr)); gap: 20px; }
-        .interface-status { padding: 10px; border-radius: 3px; margin: 5px 0; }
-        .healthy { background-color: #d4edda; border: 1px solid #c3e6cb; color: #155724; }
-        .degraded { background-color: #fff3cd; border: 1px solid #ffeaa7; color: #856404; }
-        .failed { background-color: #f8d7da; border: 1px solid #f5c6cb; color: #721c24; }
-        .controls { display: flex; gap: 10px; margin: 10px 0; }
-        button { padding: 8px 16px; border: none; border-radius: 3px; cursor: pointer; }
-        .btn-primary { background-color: #007bff; color: white; }
-        .btn-danger { background-color: #dc3545; color: white; }
-        .btn-success { background-color: #28a745; color: white; }
-        .logs { background-color: #f8f9fa; border: 1px solid #dee2e6; padding: 10px; font-family: monospace; font-size: 12px; max-height: 300px; overflow-y: auto; }
-        .latency-chart { height: 200px; background: #f8f9fa; border: 1px solid #dee2e6; display: flex; align-items: center; justify-content: center; color: #6c757d; }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>RouterOS Dashboard</h1>
-            <p>Smart Multi-WAN Router Management</p>
-        </div>
-        
-        <div class="status-grid">
-            <div class="card">
-                <h2>System Status</h2>
-                <div id="system-status">Loading...</div>
-            </div>
-            
-            <div class="card">
-                <h2>Interface Status</h2>
-                <div id="interface-status">Loading...</div>
-            </div>
-            
-            <div class="card">
-                <h2>Controls</h2>
-                <div class="controls">
-                    <button class="btn-primary" onclick="refreshStatus()">Refresh</button>
-                    <button class="btn-success" onclick="startWatchdog()">Start Watchdog</button>
-                    <button class="btn-danger" onclick="stopWatchdog()">Stop Watchdog</button>
-                    <button class="btn-primary" onclick="restartWatchdog()">Restart Watchdog</button>
-                </div>
-            </div>
-            
-            <div class="card">
-                <h2>Latency Monitoring</h2>
-                <div class="latency-chart">
-                    <div>Real-time latency charts will appear here</div>
-                </div>
-            </div>
-            
-            <div class="card">
-                <h2>System Logs</h2>
-                <div id="system-logs" class="logs">Loading...</div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        function refreshStatus() {
-            fetch('/api/status')
-                .then(response => response.json())
-                .then(data => {
-                    document.getElementById('system-status').innerHTML = `
-                        <div>Overall Health: <strong>${data.overall_health || 'Unknown'}</strong></div>
-                        <div>Service Running: ${data.service_running ? 'Yes' : 'No'}</div>
-                        <div>Last Update: ${new Date(data.timestamp * 1000).toLocaleString()}</div>
-                    `;
-                })
-                .catch(error => {
-                    document.getElementById('system-status').innerHTML = `<div style="color: red;">Error: ${error.message}</div>`;
-                });
-            
-            fetch('/api/interfaces')
-                .then(response => response.json())
-                .then(data => {
-                    let html = '';
-                    if (data.wan_interfaces) {
-                        data.wan_interfaces.forEach(iface => {
-                            html += `
-                                <div class="interface-status healthy">
-                                    <strong>${iface.name}</strong><br>
-                                    Gateway: ${iface.gateway}<br>
-                                    Weight: ${iface.weight}<br>
-                                    DNS: ${iface.dns.join(', ')}
-                                </div>
-                            `;
-                        });
-                    }
-                    document.getElementById('interface-status').innerHTML = html || 'No interfaces configured';
-                })
-                .catch(error => {
-                    document.getElementById('interface-status').innerHTML = `<div style="color: red;">Error: ${error.message}</div>`;
-                });
-            
-            fetch('/api/logs?lines=50')
-                .then(response => response.json())
-                .then(data => {
-                    document.getElementById('system-logs').innerHTML = data.logs || 'No logs available';
-                    document.getElementById('system-logs').scrollTop = document.getElementById('system-logs').scrollHeight;
-                })
-                .catch(error => {
-                    document.getElementById('system-logs').innerHTML = `Error: ${error.message}`;
-                });
-        }
-        
-        function startWatchdog() {
-            fetch('/api/watchdog/start')
-                .then(response => response.json())
-                .then(data => {
-                    alert(data.message || 'Watchdog started');
-                    refreshStatus();
-                });
-        }
-        
-        function stopWatchdog() {
-            fetch('/api/watchdog/stop')
-                .then(response => response.json())
-                .then(data => {
-                    alert(data.message || 'Watchdog stopped');
-                    refreshStatus();
-                });
-        }
-        
-        function restartWatchdog() {
-            fetch('/api/watchdog/restart')
-                .then(response => response.json())
-                .then(data => {
-                    alert(data.message || 'Watchdog restarted');
-                    refreshStatus();
-                });
-        }
-        
-        // Auto-refresh every 10 seconds
-        setInterval(refreshStatus, 10000);
-        
-        // Initial load
-        refreshStatus();
-    </script>
-</body>
-</html>''')
+    # Production: serve requests concurrently so slow control/stat calls
+    # do not queue every other dashboard request behind them
+    try:
+        import waitress
+    except ImportError:
+        logger.warning("waitress not installed, falling back to threaded development server")
+        app.run(host=args.host, port=args.port, threaded=True)
+        return
     
-    app.run(host=args.host, port=args.port, debug=args.debug)
+    waitress.serve(app, host=args.host, port=args.port, threads=8, connection_limit=500)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
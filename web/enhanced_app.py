@@ -4,30 +4,107 @@ Smart Multi-WAN Router OS - Enhanced Web Management Dashboard
 Provides real-time monitoring, latency graphs, and advanced management features
 """
 
-from flask import Flask, render_template, jsonify, request, send_from_directory
-import json
+from flask import Flask, Response, jsonify, render_template, request, send_from_directory, stream_with_context
+from werkzeug.routing import BaseConverter, ValidationError
 import os
 import time
 import logging
 import subprocess
+import heapq
+import hashlib
+import fcntl
+import gzip
+import csv
+import io
+from collections import deque
 from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
+from typing import Optional
+from operator import itemgetter
 from threading import Lock
 from latency_monitor import LatencyMonitor
 import threading
 import sys
 
+try:
+    from pystemd.systemd1 import Unit as SystemdUnit
+except ImportError:  # optional; fall back to the systemctl binary
+    SystemdUnit = None
+
 # Add web module to path for WAN manager
 sys.path.append('/opt/routeros/web')
 from wan_manager import wan_manager_bp
 
+# Interface control runs in-process when the watchdog is installed alongside
+sys.path.append('/opt/routeros/watchdog')
+try:
+    from watchdog_service import control_interface as _watchdog_control_interface
+except ImportError:  # fall back to running the watchdog script
+    _watchdog_control_interface = None
+from json_provider import ORJSONProvider
+
+WATCHDOG_UNIT = b'routeros-watchdog.service'
+_SYSTEMD_JOB_METHODS = {'start': 'Start', 'stop': 'Stop', 'restart': 'Restart'}
+_SYSTEMCTL_ARGS = {
+    'status': ('systemctl', 'is-active', 'routeros-watchdog'),
+    'start': ('systemctl', 'start', 'routeros-watchdog'),
+    'stop': ('systemctl', 'stop', 'routeros-watchdog'),
+    'restart': ('systemctl', 'restart', 'routeros-watchdog')
+}
+
+GRAPH_CACHE_TTL = 5  # seconds
+# Long ranges are sampled down to ~100 points, so one new sample barely
+# moves them; they are held this long instead of refreshing on every sample
+GRAPH_LONG_RANGE_TTL = {'6h': 30, '24h': 60, '7d': 60}  # seconds
+STATIC_MAX_AGE = 86400  # seconds
+DASHBOARD_MAX_AGE = 3600  # seconds; shorter so upgrades reach browsers the same day
+INTERFACE_ACTIONS = frozenset(('enable', 'disable'))
+EVENT_STREAM_POLL = 1.0  # seconds between checks for new log lines and status
+EVENT_STREAM_KEEPALIVE = 15  # seconds; idle comment so dead clients are noticed
+# Streams end after this long and the browser reconnects, so a forgotten
+# tab does not hold one of the server's worker threads indefinitely
+EVENT_STREAM_MAX_AGE = 300  # seconds
+NETWORK_PUSH_INTERVAL = 10  # seconds between network counter pushes
+GRAPH_TIME_RANGES = frozenset(('15m', '1h', '6h', '24h', '7d'))
+LOG_FILES = (
+    '/var/log/routeros-watchdog.log',
+    '/var/log/routeros-health.log',
+    '/var/log/routeros-routing.log',
+    '/var/log/routeros-web.log',
+    '/var/log/routeros-latency.log'
+)
+# One reader per log file, shared by all requests
+_log_pool = ThreadPoolExecutor(max_workers=len(LOG_FILES), thread_name_prefix='log-tail')
+# Held while this process runs latency collection, so reloader parents and
+# extra WSGI workers on the same host do not ping and write in duplicate
+BACKGROUND_LOCK_FILE = '/var/run/routeros-enhanced-web.lock'
+
+class InterfaceConverter(BaseConverter):
+    """URL converter matching only interfaces the latency monitor tracks"""
+    
+    regex = r'[\w.:-]{1,15}'  # IFNAMSIZ - 1
+    
+    def to_python(self, value):
+        if value not in web_interface.latency_interfaces:
+            raise ValidationError()
+        return value
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+app.url_map.converters['iface'] = InterfaceConverter
 app.config['SECRET_KEY'] = 'routeros-secret-key-change-in-production'
+# Browsers revalidate static assets (ETag/Last-Modified) at most once a day
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = STATIC_MAX_AGE
 
 # Register WAN management blueprint
 app.register_blueprint(wan_manager_bp)
 
-# Global lock for thread safety
+# Serializes latency refreshes only; status reads never take it
 status_lock = Lock()
+# Serializes graph rebuilds so concurrent misses share one query
+graph_lock = Lock()
 
 # Setup logging
 logging.basicConfig(
@@ -40,98 +117,262 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def tail_lines(path: str, n: int) -> list:
+    """Return the last n lines of a file, reading backwards from the end"""
+    with open(path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = bytearray()
+        while pos > 0 and buf.count(b'\n') <= n:
+            step = min(8192, pos)
+            pos -= step
+            f.seek(pos)
+            buf[:0] = f.read(step)
+    
+    return buf.decode('utf-8', 'replace').splitlines()[-n:] if n > 0 else []
+
+def _tail_file(log_file: str, lines: int) -> tuple:
+    """Tail one log as (timestamp prefix, display line) pairs
+    
+    Returns (entries, error message); a missing file yields no entries.
+    """
+    try:
+        # Read only the tail; log size no longer bounds the cost
+        name = os.path.basename(log_file)
+        return [(line[:23], f"[{name}] {line.strip()}")
+                for line in tail_lines(log_file, lines)], None
+    except FileNotFoundError:
+        return [], None
+    except Exception as e:
+        return [], f"Error reading {log_file}: {e}"
+
+@lru_cache(maxsize=1)
+def _iso_now(second: int) -> str:
+    """ISO timestamp for a whole second; reformatted only when the second changes"""
+    return datetime.fromtimestamp(second).isoformat()
+
+@lru_cache(maxsize=1)
+def _dashboard_page() -> tuple:
+    """Dashboard page rendered once with the monitored interfaces inlined
+    
+    Returns (page, ETag, gzipped page, gzipped ETag).
+    """
+    page = render_template('enhanced_dashboard.html',
+                           interfaces=sorted(web_interface.latency_interfaces)).encode()
+    page_gz = gzip.compress(page, compresslevel=9)
+    return (page, hashlib.blake2b(page, digest_size=8).hexdigest(),
+            page_gz, hashlib.blake2b(page_gz, digest_size=8).hexdigest())
+
 class EnhancedRouterOSWebInterface:
     """Enhanced web interface with real-time latency monitoring and graphs"""
     
     def __init__(self):
-        self.status_file = '/opt/routeros/web/status.json'
+        self.start_time = time.time()
+        self.status_file = '/run/routeros/status.json'
         self.config_file = '/opt/routeros/config/interfaces.json'
         self.watchdog_script = '/opt/routeros/watchdog/watchdog_service.py'
-        self.status_cache = {}
-        self.cache_timestamp = 0
-        self.cache_duration = 5  # seconds
-        
-        # Initialize latency monitor
+        self._file_status = (None, None)  # (status.json mtime, parsed contents)
+        self._latency_status = (0, {})  # (fetch time, latency monitor status)
+        self.cache_duration = 5  # seconds, latency status only
+        self._status_blob = (None, None)  # ((mtime, latency fetch time), serialized status)
+        self._status_snapshot = (None, None)  # ((mtime, latency fetch time), status)
+        self._watchdog_unit = None  # pystemd unit proxy, loaded on first use
+        self._graph_cache = {}  # (interface, time_range) -> (data version, monotonic time, bytes)
+        self._latency_version = 0  # bumped after every latency collection
+        self._wan_names = (None, None)  # (interfaces.json mtime, WAN interface names)
+        
+        # Initialize latency monitor; collection starts in start()
         self.latency_monitor = LatencyMonitor()
-        self.latency_monitor.start_monitoring()
+        self.latency_interfaces = frozenset(self.latency_monitor.config['interfaces'])
+        self.wan_interface_names()
+        self.background_thread = None
+        self._started = False
+        self._start_lock = Lock()
+        self._background_lock_fd = None
+    
+    def start(self) -> bool:
+        """Start latency monitoring and the background updater, once per host
+        
+        Returns False when another process already holds the background lock;
+        this process then serves the data that process writes to SQLite.
+        """
+        if self._started:
+            return self._background_lock_fd is not None
         
-        # Start background thread for periodic status updates
-        self.background_thread = threading.Thread(target=self._background_updates, daemon=True)
-        self.background_thread.start()
+        with self._start_lock:
+            if self._started:
+                return self._background_lock_fd is not None
+            self._started = True
+            
+            try:
+                fd = os.open(BACKGROUND_LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+            except OSError as e:
+                logger.error(f"Cannot open background lock {BACKGROUND_LOCK_FILE}: {e}")
+                return False
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                os.close(fd)
+                logger.info("Latency collection already running in another process")
+                return False
+            self._background_lock_fd = fd
+            
+            # The background thread drives the latency monitor's cycles itself;
+            # starting the monitor's own loop too would probe and store twice
+            self.background_thread = threading.Thread(target=self._background_updates, daemon=True)
+            self.background_thread.start()
+            return True
         
     def _background_updates(self):
         """Background thread for periodic updates"""
+        # Fixed-rate schedule on the monotonic clock: collection time does not
+        # push later samples back, so spacing stays uniform
+        deadline = time.monotonic()
         while True:
             try:
-                # Update latency data
-                self.latency_monitor.collect_latency_data()
+                deadline += self.latency_monitor.config['check_interval']
+                
+                # Update latency data (and apply retention)
+                self.latency_monitor.run_cycle()
+                self._latency_version += 1
                 
-                # Sleep for check interval
-                time.sleep(self.latency_monitor.config['check_interval'])
+                # Re-serialize once per cycle so /api/status hits are a plain bytes return
+                self._refresh_status_blob(force_latency=True)
+                
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Overran the interval; resync instead of bursting to catch up
+                    deadline = time.monotonic()
                 
             except Exception as e:
                 logger.error(f"Error in background updates: {e}")
                 time.sleep(10)
+                deadline = time.monotonic()
+    
+    def get_dashboard_bytes(self, log_lines: Optional[int] = None,
+                            latency_range: Optional[str] = None) -> bytes:
+        """Status, network statistics and optionally logs and latency graphs as one object
+        
+        The cached status and graph bytes are spliced in rather than re-serialized.
+        """
+        parts = [b'{"status":', self.get_system_status_bytes(),
+                 b',"network_stats":', app.json.dumps_bytes(self.get_network_statistics())]
+        if log_lines is not None:
+            parts += (b',"logs":', app.json.dumps_bytes(self.get_system_logs(log_lines)))
+        if latency_range is not None:
+            parts += (b',"latency":',
+                      self.get_latency_graphs_bytes(sorted(self.latency_interfaces), latency_range))
+        parts.append(b'}')
+        return b''.join(parts)
     
     def get_system_status(self) -> dict:
-        """Get current system status with caching"""
-        current_time = time.time()
+        """Get current system status (a shared snapshot; callers must not mutate it)"""
+        try:
+            return self._build_status()[1]
+        except Exception as e:
+            logger.error(f"Failed to get system status: {e}")
+            return self._error_status(e)
+    
+    def get_system_status_bytes(self) -> bytes:
+        """Get serialized system status, re-serializing only when the snapshot changed"""
+        return self._refresh_status_blob()
+    
+    def _refresh_status_blob(self, force_latency: bool = False) -> bytes:
+        """Return the cached serialized status, rebuilding it when status.json
+        changed or the latency TTL expired; errors are returned but not cached"""
+        try:
+            key, status = self._build_status(force_latency)
+        except Exception as e:
+            logger.error(f"Failed to get system status: {e}")
+            return app.json.dumps_bytes(self._error_status(e))
         
-        with status_lock:
-            if current_time - self.cache_timestamp < self.cache_duration:
-                return self.status_cache.copy()
+        cached_key, blob = self._status_blob
+        if blob is None or key != cached_key:
+            blob = app.json.dumps_bytes(status)
+            self._status_blob = (key, blob)
+        return blob
+    
+    def _build_status(self, force_latency: bool = False) -> tuple:
+        """Return ((status.json mtime, latency fetch time), merged status); raises on read errors"""
+        current_time = time.time()
         
+        # Only re-read status.json when the watchdog has rewritten it
         try:
-            # Read status from watchdog service
-            if os.path.exists(self.status_file):
-                with open(self.status_file, 'r') as f:
-                    status = json.load(f)
-            else:
-                # Fallback status if watchdog hasn't created file yet
-                status = {
-                    'timestamp': current_time,
-                    'overall_health': 'unknown',
-                    'service_running': False,
-                    'components': {}
-                }
-            
-            # Add latency monitoring data
-            latency_status = self.latency_monitor.get_interface_status()
-            status['latency_monitoring'] = latency_status
-            
-            # Add web interface specific data
-            status['web_interface'] = {
-                'version': '2.0.0',
-                'uptime': current_time - getattr(self, 'start_time', current_time),
-                'last_update': datetime.now().isoformat(),
-                'features': ['realtime_latency', 'graphs', 'export', 'alerts']
+            mtime = os.stat(self.status_file).st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        
+        cached_mtime, file_status = self._file_status
+        if mtime is None:
+            # Fallback status if watchdog hasn't created file yet
+            file_status = {
+                'timestamp': current_time,
+                'overall_health': 'unknown',
+                'service_running': False,
+                'components': {}
             }
-            
-            # Cache the result
+        elif mtime != cached_mtime:
+            with open(self.status_file, 'rb') as f:
+                file_status = app.json.loads(f.read())
+            self._file_status = (mtime, file_status)
+        
+        # Latency data changes independently of status.json; keep it on a TTL.
+        # The tuple is rebound atomically, so a fresh entry is read lock-free.
+        fetched, latency_status = self._latency_status
+        if force_latency or current_time - fetched >= self.cache_duration:
             with status_lock:
-                self.status_cache = status.copy()
-                self.cache_timestamp = current_time
-            
-            return status
-            
-        except Exception as e:
-            logger.error(f"Failed to get system status: {e}")
-            return {
-                'timestamp': current_time,
-                'overall_health': 'error',
-                'error': str(e),
-                'web_interface': {
-                    'version': '2.0.0',
-                    'last_update': datetime.now().isoformat()
-                }
+                fetched, latency_status = self._latency_status
+                # Another thread may have refreshed it while we waited
+                if force_latency or current_time - fetched >= self.cache_duration:
+                    fetched = current_time
+                    latency_status = self.latency_monitor.get_interface_status()
+                    self._latency_status = (fetched, latency_status)
+        
+        # Neither input changed: hand back the same snapshot. Snapshots are
+        # rebound, never mutated, so readers need no lock and no copy.
+        key = (mtime, fetched)
+        snapshot_key, snapshot = self._status_snapshot
+        if snapshot is not None and snapshot_key == key:
+            return key, snapshot
+        
+        # Shallow merge: the cached file contents are never mutated
+        status = dict(file_status)
+        if mtime is not None:
+            # An unchanged status is only touched; its mtime is the watchdog's last tick
+            status['timestamp'] = mtime / 1e9
+        status['latency_monitoring'] = latency_status
+        
+        # Add web interface specific data
+        status['web_interface'] = {
+            'version': '2.0.0',
+            'uptime': current_time - self.start_time,
+            'last_update': _iso_now(int(current_time)),
+            'features': ['realtime_latency', 'graphs', 'export', 'alerts']
+        }
+        
+        self._status_snapshot = (key, status)
+        return key, status
+    
+    def _error_status(self, error: Exception) -> dict:
+        """Status payload reported when status.json cannot be read"""
+        current_time = time.time()
+        return {
+            'timestamp': current_time,
+            'overall_health': 'error',
+            'error': str(error),
+            'web_interface': {
+                'version': '2.0.0',
+                'last_update': _iso_now(int(current_time))
             }
+        }
     
     def get_interface_config(self) -> dict:
         """Get interface configuration"""
         try:
             if os.path.exists(self.config_file):
-                with open(self.config_file, 'r') as f:
-                    return json.load(f)
+                with open(self.config_file, 'rb') as f:
+                    return app.json.loads(f.read())
             else:
                 # Default configuration
                 return {
@@ -144,6 +385,20 @@ class EnhancedRouterOSWebInterface:
             logger.error(f"Failed to get interface config: {e}")
             return {'error': str(e)}
     
+    def wan_interface_names(self) -> frozenset:
+        """Configured WAN interface names, re-read only when interfaces.json changes"""
+        try:
+            mtime = os.stat(self.config_file).st_mtime_ns
+        except OSError:
+            mtime = None
+        
+        cached_mtime, names = self._wan_names
+        if names is None or mtime != cached_mtime:
+            config = self.get_interface_config()
+            names = frozenset(wan.get('name') for wan in config.get('wan_interfaces', ()))
+            self._wan_names = (mtime, names)
+        return names
+    
     def get_latency_graph_data(self, interface: str, time_range: str = '1h') -> dict:
         """Get latency graph data for specified interface and time range"""
         try:
@@ -152,6 +407,50 @@ class EnhancedRouterOSWebInterface:
             logger.error(f"Failed to get latency graph data: {e}")
             return {'error': str(e)}
     
+    def get_latency_graph_bytes(self, interface: str, time_range: str) -> bytes:
+        """Get serialized graph data, shared by all clients for up to GRAPH_CACHE_TTL
+        
+        A latency collection invalidates the cached short-range graphs so new
+        samples show at once; long ranges keep theirs for GRAPH_LONG_RANGE_TTL.
+        """
+        key = (interface, time_range)
+        blob = self._cached_graph(key)
+        if blob is not None:
+            return blob
+        
+        with graph_lock:
+            # Another thread may have rebuilt it while we waited
+            blob = self._cached_graph(key)
+            if blob is not None:
+                return blob
+            
+            version = self._latency_version
+            data = self.get_latency_graph_data(interface, time_range)
+            blob = app.json.dumps_bytes(data)
+            if 'error' not in data:
+                self._graph_cache[key] = (version, time.monotonic(), blob)
+            return blob
+    
+    def _cached_graph(self, key: tuple) -> Optional[bytes]:
+        """Cached graph bytes for (interface, time_range) if still fresh"""
+        cached = self._graph_cache.get(key)
+        if cached is None:
+            return None
+        
+        version, built, blob = cached
+        age = time.monotonic() - built
+        ttl = GRAPH_LONG_RANGE_TTL.get(key[1])
+        if ttl is not None:
+            return blob if age < ttl else None
+        return blob if version == self._latency_version and age < GRAPH_CACHE_TTL else None
+    
+    def get_latency_graphs_bytes(self, interfaces, time_range: str) -> bytes:
+        """Graph data for several interfaces as one object keyed by interface"""
+        return b'{' + b','.join(
+            app.json.dumps_bytes(interface) + b':' + self.get_latency_graph_bytes(interface, time_range)
+            for interface in interfaces
+        ) + b'}'
+    
     def get_latency_summary(self, interface: str, hours: int = 24) -> dict:
         """Get latency summary statistics"""
         try:
@@ -168,36 +467,63 @@ class EnhancedRouterOSWebInterface:
             logger.error(f"Failed to export latency data: {e}")
             return f"Error: {str(e)}"
     
+    def iter_latency_csv(self, interface: str, hours: int = 24):
+        """Yield a CSV export of latency data, one chunk per database batch"""
+        buf = io.StringIO()
+        writer = csv.writer(buf, lineterminator='\n')
+        writer.writerow(('timestamp', 'interface', 'target', 'latency', 'packet_loss', 'status'))
+        
+        try:
+            for rows in self.latency_monitor.iter_export_rows(interface, hours):
+                writer.writerows(rows)
+                yield buf.getvalue()
+                buf.seek(0)
+                buf.truncate()
+        except Exception as e:
+            # Headers are already sent; log and end the stream early
+            logger.error(f"Failed to export latency data: {e}")
+        
+        if buf.tell():
+            yield buf.getvalue()
+    
     def control_watchdog_service(self, action: str) -> dict:
         """Control the watchdog service"""
+        if SystemdUnit is not None and (action == 'status' or action in _SYSTEMD_JOB_METHODS):
+            try:
+                return self._control_watchdog_dbus(action)
+            except Exception as e:
+                logger.warning(f"D-Bus control of watchdog failed, using systemctl: {e}")
+        
+        argv = _SYSTEMCTL_ARGS.get(action)
+        if argv is None:
+            return {'error': f'Unknown action: {action}'}
+        
         try:
+            result = subprocess.run(argv, capture_output=True, text=True)
+            
             if action == 'status':
-                result = subprocess.run(['systemctl', 'is-active', 'routeros-watchdog'], 
-                                      capture_output=True, text=True)
                 return {'status': result.stdout.strip(), 'running': result.returncode == 0}
-            
-            elif action == 'start':
-                result = subprocess.run(['systemctl', 'start', 'routeros-watchdog'], 
-                                      capture_output=True, text=True)
-                return {'success': result.returncode == 0, 'message': result.stdout or result.stderr}
-            
-            elif action == 'stop':
-                result = subprocess.run(['systemctl', 'stop', 'routeros-watchdog'], 
-                                      capture_output=True, text=True)
-                return {'success': result.returncode == 0, 'message': result.stdout or result.stderr}
-            
-            elif action == 'restart':
-                result = subprocess.run(['systemctl', 'restart', 'routeros-watchdog'], 
-                                      capture_output=True, text=True)
-                return {'success': result.returncode == 0, 'message': result.stdout or result.stderr}
-            
-            else:
-                return {'error': f'Unknown action: {action}'}
+            return {'success': result.returncode == 0, 'message': result.stdout or result.stderr}
                 
         except Exception as e:
             logger.error(f"Failed to control watchdog service: {e}")
             return {'error': str(e)}
     
+    def _control_watchdog_dbus(self, action: str) -> dict:
+        """Control the watchdog unit through systemd's D-Bus API"""
+        if self._watchdog_unit is None:
+            # One unit proxy (and its bus connection) reused for every call
+            unit = SystemdUnit(WATCHDOG_UNIT)
+            unit.load()
+            self._watchdog_unit = unit
+        
+        if action == 'status':
+            state = self._watchdog_unit.Unit.ActiveState.decode()
+            return {'status': state, 'running': state == 'active'}
+        
+        job = getattr(self._watchdog_unit.Unit, _SYSTEMD_JOB_METHODS[action])(b'replace')
+        return {'success': True, 'message': f"{action} job queued: {job.decode()}"}
+    
     def control_interface(self, interface: str, action: str) -> dict:
         """Manual control of interface (kill-switch functionality)"""
         try:
@@ -205,6 +531,13 @@ class EnhancedRouterOSWebInterface:
                 # Interface with the watchdog service
                 logger.info(f"Manual interface control: {interface} {action}")
                 
+                if _watchdog_control_interface is not None:
+                    if _watchdog_control_interface(interface, action):
+                        logger.info(f"Successfully {action}d interface {interface}")
+                        return {'success': True, 'message': f'Interface {interface} {action}d successfully'}
+                    logger.error(f"Failed to {action} interface {interface}")
+                    return {'error': f'Failed to {action} interface {interface}'}
+                
                 # Call watchdog service to handle interface control
                 result = subprocess.run([
                     'python3', self.watchdog_script, 
@@ -227,64 +560,117 @@ class EnhancedRouterOSWebInterface:
     def get_system_logs(self, lines: int = 100) -> str:
         """Get system logs"""
         try:
-            log_files = [
-                '/var/log/routeros-watchdog.log',
-                '/var/log/routeros-health.log',
-                '/var/log/routeros-routing.log',
-                '/var/log/routeros-web.log',
-                '/var/log/routeros-latency.log'
-            ]
-            
-            logs = []
-            for log_file in log_files:
-                if os.path.exists(log_file):
-                    try:
-                        with open(log_file, 'r') as f:
-                            file_logs = f.readlines()
-                            logs.extend([f"[{os.path.basename(log_file)}] {line.strip()}" 
-                                       for line in file_logs[-lines//len(log_files):]])
-                    except Exception as e:
-                        logs.append(f"Error reading {log_file}: {e}")
-            
-            # Sort by timestamp and limit lines
-            logs.sort()
+            per_file = -(-lines // len(LOG_FILES))
+            sources = []
+            errors = []
+            # Files are read concurrently; blocking reads release the GIL
+            for entries, error in _log_pool.map(_tail_file, LOG_FILES, repeat(per_file)):
+                if error:
+                    errors.append(error)
+                elif entries:
+                    sources.append(entries)
+            
+            # Each tail is already in time order; merge on the timestamp prefix
+            merged = deque((line for _, line in heapq.merge(*sources, key=itemgetter(0))),
+                           maxlen=lines)
+            logs = errors + list(merged)
             return '\n'.join(logs[-lines:]) if logs else "No logs available"
             
         except Exception as e:
             logger.error(f"Failed to get system logs: {e}")
             return f"Error retrieving logs: {e}"
     
+    def iter_events(self):
+        """Yield Server-Sent Events for new log lines, status and network stats
+        
+        Log lines are plain messages. Each file is followed by byte offset; a
+        shrinking file (rotation or truncation) is read again from the start.
+        'status' events carry the serialized status whenever it changes and
+        'network' events the interface counters, at most every
+        NETWORK_PUSH_INTERVAL seconds.
+        """
+        positions = {}
+        for log_file in LOG_FILES:
+            try:
+                positions[log_file] = os.stat(log_file).st_size
+            except OSError:
+                positions[log_file] = 0
+        
+        yield 'retry: 3000\n\n'
+        
+        now = time.monotonic()
+        deadline = now + EVENT_STREAM_MAX_AGE
+        last_sent = now
+        status_blob = network_blob = None
+        network_checked = now - NETWORK_PUSH_INTERVAL
+        while now < deadline:
+            events = []
+            
+            # The cached blob is returned as-is until the status changes
+            blob = self.get_system_status_bytes()
+            if blob != status_blob:
+                status_blob = blob
+                events.append(f"event: status\ndata: {blob.decode()}\n\n")
+            
+            if now - network_checked >= NETWORK_PUSH_INTERVAL:
+                network_checked = now
+                blob = app.json.dumps_bytes(self.get_network_statistics())
+                if blob != network_blob:
+                    network_blob = blob
+                    events.append(f"event: network\ndata: {blob.decode()}\n\n")
+            
+            for log_file in LOG_FILES:
+                try:
+                    size = os.stat(log_file).st_size
+                except OSError:
+                    continue
+                
+                pos = positions[log_file]
+                if size < pos:
+                    pos = 0
+                if size == pos:
+                    continue
+                
+                with open(log_file, 'rb') as f:
+                    f.seek(pos)
+                    chunk = f.read(size - pos)
+                # Leave a partially written last line for the next pass
+                end = chunk.rfind(b'\n') + 1
+                positions[log_file] = pos + end
+                
+                name = os.path.basename(log_file)
+                events.extend(f"data: [{name}] {line}\n\n"
+                              for line in chunk[:end].decode('utf-8', 'replace').splitlines())
+            
+            if events:
+                yield ''.join(events)
+                last_sent = now
+            elif now - last_sent >= EVENT_STREAM_KEEPALIVE:
+                yield ': keepalive\n\n'
+                last_sent = now
+            
+            time.sleep(EVENT_STREAM_POLL)
+            now = time.monotonic()
+    
     def get_network_statistics(self) -> dict:
         """Get network interface statistics"""
         try:
-            # Get interface statistics using ip command
-            result = subprocess.run(['ip', '-s', 'link'], capture_output=True, text=True)
-            if result.returncode != 0:
-                return {'error': 'Failed to get interface statistics'}
+            # Kernel counters straight from /proc; no ip(8) fork or text parsing
+            with open('/proc/net/dev', 'rb') as f:
+                data = f.read()
             
-            # Parse the output (simplified parsing)
             interfaces = {}
-            lines = result.stdout.strip().split('\n')
-            current_iface = None
-            
-            for line in lines:
-                if line.startswith(':'):
-                    parts = line.split(':')
-                    if len(parts) >= 3:
-                        current_iface = parts[1].strip()
-                        interfaces[current_iface] = {'status': parts[2].strip()}
-                elif current_iface and line.strip():
-                    # This is statistics line - simplified parsing
-                    if 'RX:' in line or 'TX:' in line:
-                        continue
-                    stats = line.strip().split()
-                    if len(stats) >= 2 and current_iface in interfaces:
-                        if 'rx_bytes' not in interfaces[current_iface]:
-                            interfaces[current_iface]['rx_bytes'] = stats[0]
-                            interfaces[current_iface]['rx_packets'] = stats[1]
-                        else:
-                            interfaces[current_iface]['tx_bytes'] = stats[0]
-                            interfaces[current_iface]['tx_packets'] = stats[1]
+            for line in data.splitlines()[2:]:
+                name, _, counters = line.partition(b':')
+                fields = counters.split()
+                if len(fields) < 16:
+                    continue
+                interfaces[name.strip().decode()] = {
+                    'rx_bytes': int(fields[0]),
+                    'rx_packets': int(fields[1]),
+                    'tx_bytes': int(fields[8]),
+                    'tx_packets': int(fields[9])
+                }
             
             return {'interfaces': interfaces}
             
@@ -294,17 +680,57 @@ class EnhancedRouterOSWebInterface:
 
 # Initialize the web interface
 web_interface = EnhancedRouterOSWebInterface()
-web_interface.start_time = time.time()
+
+@app.before_request
+def _start_background():
+    """Start collection in whichever process actually serves requests"""
+    web_interface.start()
+
+def _conditional_json(body: bytes):
+    """JSON response with a content-hash ETag, answered with 304 when the client has it"""
+    response = Response(body, mimetype='application/json')
+    response.set_etag(hashlib.blake2b(body, digest_size=8).hexdigest(), weak=True)
+    return response.make_conditional(request)
+
+def _cacheable_graph(response):
+    """Let browsers and proxies reuse graph data as long as the server cache does"""
+    response.cache_control.public = True
+    response.cache_control.max_age = GRAPH_CACHE_TTL
+    return response
 
 @app.route('/')
 def dashboard():
     """Main dashboard page with enhanced features"""
-    return render_template('enhanced_dashboard.html')
+    # Interfaces are fixed for the process lifetime, so the page is rendered
+    # and compressed once; revisits with a matching ETag get a 304
+    gzipped = request.accept_encodings['gzip']
+    page, etag, page_gz, etag_gz = _dashboard_page()
+    response = Response(page_gz if gzipped else page, mimetype='text/html')
+    response.set_etag(etag_gz if gzipped else etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = DASHBOARD_MAX_AGE
+    response = response.make_conditional(request)
+    if gzipped and response.status_code == 200:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.vary.add('Accept-Encoding')
+    return response
 
 @app.route('/api/status')
 def api_status():
     """API endpoint for system status"""
-    return jsonify(web_interface.get_system_status())
+    return Response(web_interface.get_system_status_bytes(), mimetype='application/json')
+
+@app.route('/api/dashboard')
+def api_dashboard():
+    """API endpoint combining status, network statistics and, on request, logs
+    (?logs=N) and latency graphs for every monitored interface (?latency=1h)"""
+    log_lines = request.args.get('logs', type=int)
+    latency_range = request.args.get('latency')
+    if latency_range is not None and latency_range not in GRAPH_TIME_RANGES:
+        return jsonify({'error': f'Unknown time range: {latency_range}'}), 400
+    
+    return Response(web_interface.get_dashboard_bytes(log_lines, latency_range),
+                    mimetype='application/json')
 
 @app.route('/api/interfaces')
 def api_interfaces():
@@ -321,31 +747,49 @@ def api_save_interfaces():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
-@app.route('/api/latency/graph/<interface>/<time_range>')
+@app.route('/api/latency/graph/<iface:interface>/<any(15m, 1h, 6h, 24h, 7d):time_range>')
 def api_latency_graph(interface, time_range):
     """API endpoint for latency graph data"""
-    return jsonify(web_interface.get_latency_graph_data(interface, time_range))
+    body = web_interface.get_latency_graph_bytes(interface, time_range)
+    return _cacheable_graph(_conditional_json(body))
+
+@app.route('/api/latency/graph')
+def api_latency_graphs():
+    """API endpoint for several interfaces' graph data (?ifaces=a,b&range=1h)"""
+    time_range = request.args.get('range', '1h')
+    if time_range not in GRAPH_TIME_RANGES:
+        return jsonify({'error': f'Unknown time range: {time_range}'}), 400
+    
+    interfaces = list(dict.fromkeys(filter(None, request.args.get('ifaces', '').split(','))))
+    unknown = [i for i in interfaces if i not in web_interface.latency_interfaces]
+    if unknown:
+        return jsonify({'error': f"Unknown interfaces: {', '.join(unknown)}"}), 400
+    
+    body = web_interface.get_latency_graphs_bytes(interfaces, time_range)
+    return _cacheable_graph(_conditional_json(body))
 
-@app.route('/api/latency/summary/<interface>')
+@app.route('/api/latency/summary/<iface:interface>')
 def api_latency_summary(interface):
     """API endpoint for latency summary statistics"""
     hours = request.args.get('hours', 24, type=int)
     return jsonify(web_interface.get_latency_summary(interface, hours))
 
-@app.route('/api/latency/export/<interface>')
+@app.route('/api/latency/export/<iface:interface>')
 def api_latency_export(interface):
     """API endpoint to export latency data"""
     format_type = request.args.get('format', 'json')
     hours = request.args.get('hours', 24, type=int)
-    data = web_interface.export_latency_data(interface, format_type, hours)
     
     if format_type == 'csv':
-        return data, 200, {
-            'Content-Type': 'text/csv',
-            'Content-Disposition': f'attachment; filename=latency_{interface}_{hours}h.csv'
-        }
-    else:
-        return data, 200, {'Content-Type': 'application/json'}
+        # Streamed in batches: memory stays flat however many hours are requested
+        return Response(
+            stream_with_context(web_interface.iter_latency_csv(interface, hours)),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename=latency_{interface}_{hours}h.csv'}
+        )
+    
+    data = web_interface.export_latency_data(interface, format_type, hours)
+    return data, 200, {'Content-Type': 'application/json'}
 
 @app.route('/api/watchdog/<action>')
 def api_watchdog_control(action):
@@ -356,6 +800,12 @@ def api_watchdog_control(action):
 @app.route('/api/interface/<interface>/<action>')
 def api_interface_control(interface, action):
     """API endpoint for interface control"""
+    # Reject typos and unknown names before anything is spawned
+    if action not in INTERFACE_ACTIONS:
+        return jsonify({'error': f'Unknown action: {action}'}), 400
+    if interface not in web_interface.wan_interface_names():
+        return jsonify({'error': f'Unknown interface: {interface}'}), 400
+    
     result = web_interface.control_interface(interface, action)
     return jsonify(result)
 
@@ -366,6 +816,12 @@ def api_logs():
     logs = web_interface.get_system_logs(lines)
     return jsonify({'logs': logs})
 
+@app.route('/api/events')
+def api_events():
+    """API endpoint pushing log lines, status and network stats as Server-Sent Events"""
+    return Response(web_interface.iter_events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
 @app.route('/api/network-stats')
 def api_network_stats():
     """API endpoint for network statistics"""
@@ -374,7 +830,7 @@ def api_network_stats():
 @app.route('/static/<path:filename>')
 def static_files(filename):
     """Serve static files"""
-    return send_from_directory('static', filename)
+    return send_from_directory('static', filename, conditional=True, max_age=STATIC_MAX_AGE)
 
 # Error handlers
 @app.errorhandler(404)
@@ -385,943 +841,6 @@ def not_found(error):
 def internal_error(error):
     return jsonify({'error': 'Internal server error'}), 500
 
-def create_enhanced_dashboard():
-    """Create enhanced dashboard HTML template"""
-    template_path = 'templates/enhanced_dashboard.html'
-    os.makedirs('templates', exist_ok=True)
-    
-    html_content = '''<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>RouterOS Enhanced Dashboard</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body { 
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; 
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-            color: #333;
-        }
-        .container { 
-            max-width: 1400px; 
-            margin: 0 auto; 
-            padding: 20px; 
-        }
-        .header { 
-            background: rgba(255, 255, 255, 0.95); 
-            backdrop-filter: blur(10px);
-            border-radius: 15px; 
-            padding: 30px; 
-            margin-bottom: 30px; 
-            box-shadow: 0 8px 32px rgba(0,0,0,0.1);
-            border: 1px solid rgba(255,255,255,0.2);
-        }
-        .header h1 { 
-            color: #2c3e50; 
-            font-size: 2.5em; 
-            margin-bottom: 10px; 
-            text-align: center;
-        }
-        .header p { 
-            color: #7f8c8d; 
-            text-align: center; 
-            font-size: 1.1em;
-        }
-        .dashboard-grid { 
-            display: grid; 
-            grid-template-columns: repeat(auto-fit, minmax(400px, 1fr)); 
-            gap: 25px; 
-            margin-bottom: 30px;
-        }
-        .card { 
-            background: rgba(255, 255, 255, 0.95); 
-            backdrop-filter: blur(10px);
-            border-radius: 15px; 
-            padding: 25px; 
-            box-shadow: 0 8px 32px rgba(0,0,0,0.1);
-            border: 1px solid rgba(255,255,255,0.2);
-            transition: transform 0.3s ease, box-shadow 0.3s ease;
-        }
-        .card:hover { 
-            transform: translateY(-5px); 
-            box-shadow: 0 12px 40px rgba(0,0,0,0.15);
-        }
-        .card h2 { 
-            color: #2c3e50; 
-            margin-bottom: 20px; 
-            font-size: 1.4em;
-            border-bottom: 2px solid #3498db;
-            padding-bottom: 10px;
-        }
-        .status-indicator {
-            display: inline-block;
-            width: 12px;
-            height: 12px;
-            border-radius: 50%;
-            margin-right: 8px;
-        }
-        .status-healthy { background-color: #27ae60; }
-        .status-degraded { background-color: #f39c12; }
-        .status-failed { background-color: #e74c3c; }
-        .status-unknown { background-color: #95a5a6; }
-        .interface-card {
-            background: #f8f9fa;
-            border-radius: 10px;
-            padding: 15px;
-            margin: 10px 0;
-            border-left: 4px solid #3498db;
-        }
-        .controls {
-            display: flex;
-            gap: 10px;
-            flex-wrap: wrap;
-            margin: 15px 0;
-        }
-        .btn {
-            padding: 10px 20px;
-            border: none;
-            border-radius: 8px;
-            cursor: pointer;
-            font-weight: 600;
-            transition: all 0.3s ease;
-            text-decoration: none;
-            display: inline-block;
-        }
-        .btn-primary { background: #3498db; color: white; }
-        .btn-success { background: #27ae60; color: white; }
-        .btn-danger { background: #e74c3c; color: white; }
-        .btn-warning { background: #f39c12; color: white; }
-        .btn:hover { transform: translateY(-2px); box-shadow: 0 4px 12px rgba(0,0,0,0.2); }
-        .chart-container {
-            position: relative;
-            height: 300px;
-            margin: 20px 0;
-        }
-        .logs-container {
-            background: #2c3e50;
-            color: #ecf0f1;
-            border-radius: 10px;
-            padding: 15px;
-            font-family: 'Courier New', monospace;
-            font-size: 12px;
-            max-height: 400px;
-            overflow-y: auto;
-            line-height: 1.4;
-        }
-        .metric-grid {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(120px, 1fr));
-            gap: 15px;
-            margin: 20px 0;
-        }
-        .metric-card {
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            padding: 15px;
-            border-radius: 10px;
-            text-align: center;
-        }
-        .metric-value {
-            font-size: 1.8em;
-            font-weight: bold;
-            margin-bottom: 5px;
-        }
-        .metric-label {
-            font-size: 0.9em;
-            opacity: 0.9;
-        }
-        .time-range-selector {
-            display: flex;
-            gap: 5px;
-            margin: 15px 0;
-            flex-wrap: wrap;
-        }
-        .time-btn {
-            padding: 5px 10px;
-            border: 1px solid #3498db;
-            background: transparent;
-            color: #3498db;
-            border-radius: 5px;
-            cursor: pointer;
-            font-size: 0.9em;
-        }
-        .time-btn.active, .time-btn:hover {
-            background: #3498db;
-            color: white;
-        }
-        .alert {
-            padding: 15px;
-            border-radius: 8px;
-            margin: 15px 0;
-            border-left: 4px solid;
-        }
-        .alert-info { background: #d1ecf1; border-color: #17a2b8; color: #0c5460; }
-        .alert-warning { background: #fff3cd; border-color: #ffc107; color: #856404; }
-        .alert-danger { background: #f8d7da; border-color: #dc3545; color: #721c24; }
-        @media (max-width: 768px) {
-            .dashboard-grid { grid-template-columns: 1fr; }
-            .controls { flex-direction: column; }
-            .time-range-selector { justify-content: center; }
-        }
-        
-        /* WAN Management Styles */
-        .available-interfaces {
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-            gap: 15px;
-            margin: 20px 0;
-        }
-        
-        .wan-config-modal {
-            position: fixed;
-            top: 0;
-            left: 0;
-            width: 100%;
-            height: 100%;
-            background: rgba(0,0,0,0.7);
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            z-index: 1000;
-        }
-        
-        .modal-content {
-            background: white;
-            padding: 30px;
-            border-radius: 15px;
-            box-shadow: 0 10px 40px rgba(0,0,0,0.3);
-            max-width: 500px;
-            width: 90%;
-            max-height: 80vh;
-            overflow-y: auto;
-        }
-        
-        .modal-content h3 {
-            color: #2c3e50;
-            margin-bottom: 20px;
-            text-align: center;
-        }
-        
-        .form-group {
-            margin-bottom: 20px;
-        }
-        
-        .form-group label {
-            display: block;
-            margin-bottom: 5px;
-            font-weight: 600;
-            color: #34495e;
-        }
-        
-        .form-group input,
-        .form-group select {
-            width: 100%;
-            padding: 12px;
-            border: 2px solid #e0e0e0;
-            border-radius: 8px;
-            font-size: 14px;
-            transition: border-color 0.3s ease;
-        }
-        
-        .form-group input:focus,
-        .form-group select:focus {
-            outline: none;
-            border-color: #3498db;
-        }
-        
-        .form-actions {
-            display: flex;
-            gap: 10px;
-            justify-content: center;
-            margin-top: 25px;
-        }
-        
-        .form-actions button {
-            min-width: 120px;
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1><span class="status-indicator" id="overall-status"></span>RouterOS Dashboard</h1>
-            <p>Smart Multi-WAN Router Management with Real-time Monitoring</p>
-        </div>
-        
-        <div class="dashboard-grid">
-            <!-- System Overview -->
-            <div class="card">
-                <h2>System Overview</h2>
-                <div id="system-overview">
-                    <div class="metric-grid">
-                        <div class="metric-card">
-                            <div class="metric-value" id="overall-health">-</div>
-                            <div class="metric-label">Overall Health</div>
-                        </div>
-                        <div class="metric-card">
-                            <div class="metric-value" id="active-interfaces">-</div>
-                            <div class="metric-label">Active Interfaces</div>
-                        </div>
-                        <div class="metric-card">
-                            <div class="metric-value" id="uptime">-</div>
-                            <div class="metric-label">Uptime</div>
-                        </div>
-                        <div class="metric-card">
-                            <div class="metric-value" id="last-update">-</div>
-                            <div class="metric-label">Last Update</div>
-                        </div>
-                    </div>
-                </div>
-                
-                <div class="controls">
-                    <button class="btn btn-primary" onclick="refreshStatus()">🔄 Refresh</button>
-                    <button class="btn btn-success" onclick="startWatchdog()">▶️ Start Watchdog</button>
-                    <button class="btn btn-danger" onclick="stopWatchdog()">⏹️ Stop Watchdog</button>
-                    <button class="btn btn-warning" onclick="restartWatchdog()">🔄 Restart Watchdog</button>
-                    <button class="btn btn-info" onclick="showWANManagement()">🌐 WAN Management</button>
-                </div>
-            </div>
-            
-            <!-- Interface Status -->
-            <div class="card">
-                <h2>Interface Status</h2>
-                <div id="interface-status">
-                    <div class="alert alert-info">Loading interface status...</div>
-                </div>
-            </div>
-            
-            <!-- WAN Management -->
-            <div class="card">
-                <h2>WAN Interface Management</h2>
-                <div class="controls">
-                    <button class="btn btn-success" onclick="showAddWANDialog()">➕ Add WAN Interface</button>
-                    <button class="btn btn-primary" onclick="refreshAvailableInterfaces()">🔄 Refresh Available</button>
-                    <button class="btn btn-info" onclick="autoDetectPrimaryWAN()">🔍 Auto-Detect Primary WAN</button>
-                </div>
-                <div id="wan-management">
-                    <div class="alert alert-info">Loading WAN management interface...</div>
-                </div>
-            </div>
-            
-            <!-- Latency Monitoring -->
-            <div class="card">
-                <h2>Real-time Latency Monitoring</h2>
-                <div class="time-range-selector">
-                    <button class="time-btn" onclick="changeTimeRange('15m')">15m</button>
-                    <button class="time-btn active" onclick="changeTimeRange('1h')">1h</button>
-                    <button class="time-btn" onclick="changeTimeRange('6h')">6h</button>
-                    <button class="time-btn" onclick="changeTimeRange('24h')">24h</button>
-                    <button class="time-btn" onclick="changeTimeRange('7d')">7d</button>
-                </div>
-                <div id="latency-charts">
-                    <div class="alert alert-info">Loading latency charts...</div>
-                </div>
-            </div>
-            
-            <!-- Network Statistics -->
-            <div class="card">
-                <h2>Network Statistics</h2>
-                <div id="network-stats">
-                    <div class="alert alert-info">Loading network statistics...</div>
-                </div>
-            </div>
-            
-            <!-- System Logs -->
-            <div class="card">
-                <h2>System Logs</h2>
-                <div class="controls">
-                    <button class="btn btn-primary" onclick="refreshLogs()">🔄 Refresh Logs</button>
-                    <button class="btn btn-secondary" onclick="exportLogs()">📄 Export Logs</button>
-                </div>
-                <div id="system-logs" class="logs-container">
-                    Loading system logs...
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        let currentTimeRange = '1h';
-        let charts = {};
-        let statusUpdateInterval;
-        
-        // Initialize dashboard
-        document.addEventListener('DOMContentLoaded', function() {
-            initializeDashboard();
-            startAutoRefresh();
-        });
-        
-        function initializeDashboard() {
-            refreshStatus();
-            refreshLatencyCharts();
-            refreshNetworkStats();
-            refreshLogs();
-        }
-        
-        function startAutoRefresh() {
-            // Auto-refresh every 10 seconds
-            statusUpdateInterval = setInterval(function() {
-                refreshStatus();
-                refreshLatencyCharts();
-            }, 10000);
-        }
-        
-        function refreshStatus() {
-            fetch('/api/status')
-                .then(response => response.json())
-                .then(data => {
-                    updateSystemOverview(data);
-                    updateInterfaceStatus(data);
-                    updateOverallStatus(data);
-                })
-                .catch(error => {
-                    console.error('Failed to refresh status:', error);
-                    showAlert('danger', 'Failed to refresh system status');
-                });
-        }
-        
-        function updateSystemOverview(data) {
-            document.getElementById('overall-health').textContent = data.overall_health || 'Unknown';
-            document.getElementById('active-interfaces').textContent = 
-                data.components?.health_monitor?.healthy_interfaces || '0';
-            
-            // Calculate uptime
-            const uptime = data.web_interface?.uptime || 0;
-            document.getElementById('uptime').textContent = formatUptime(uptime);
-            
-            // Last update
-            const lastUpdate = data.web_interface?.last_update || new Date().toISOString();
-            document.getElementById('last-update').textContent = formatTimeAgo(lastUpdate);
-        }
-        
-        function updateInterfaceStatus(data) {
-            const container = document.getElementById('interface-status');
-            const interfaces = data.components?.health_monitor?.interfaces || {};
-            const latencyData = data.latency_monitoring || {};
-            
-            if (Object.keys(interfaces).length === 0) {
-                container.innerHTML = '<div class="alert alert-warning">No interfaces configured</div>';
-                return;
-            }
-            
-            let html = '';
-            for (const [iface, info] of Object.entries(interfaces)) {
-                const latency = latencyData[iface] || {};
-                const statusClass = info.current_status === 'healthy' ? 'status-healthy' : 
-                                  info.current_status === 'degraded' ? 'status-degraded' : 'status-failed';
-                
-                html += `
-                    <div class="interface-card">
-                        <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
-                            <strong>${iface}</strong>
-                            <span class="status-indicator ${statusClass}"></span>
-                        </div>
-                        <div style="font-size: 0.9em; color: #666;">
-                            <div>Status: <strong>${info.current_status}</strong></div>
-                            <div>Latency: <strong>${latency.current_latency || 0}ms</strong></div>
-                            <div>Packet Loss: <strong>${latency.current_packet_loss || 0}%</strong></div>
-                            <div>Uptime: <strong>${info.uptime_percentage || 0}%</strong></div>
-                        </div>
-                        <div class="controls" style="margin-top: 10px;">
-                            <button class="btn btn-sm btn-success" onclick="controlInterface('${iface}', 'enable')" 
-                                    ${info.current_status === 'healthy' ? 'disabled' : ''}>Enable</button>
-                            <button class="btn btn-sm btn-danger" onclick="controlInterface('${iface}', 'disable')" 
-                                    ${info.current_status === 'failed' ? 'disabled' : ''}>Disable</button>
-                            <button class="btn btn-sm btn-primary" onclick="exportLatencyData('${iface}')">Export Data</button>
-                        </div>
-                    </div>
-                `;
-            }
-            
-            container.innerHTML = html;
-        }
-        
-        function updateOverallStatus(data) {
-            const statusIndicator = document.getElementById('overall-status');
-            const health = data.overall_health || 'unknown';
-            
-            statusIndicator.className = 'status-indicator';
-            if (health === 'healthy') {
-                statusIndicator.classList.add('status-healthy');
-            } else if (health === 'degraded') {
-                statusIndicator.classList.add('status-degraded');
-            } else if (health === 'failed') {
-                statusIndicator.classList.add('status-failed');
-            } else {
-                statusIndicator.classList.add('status-unknown');
-            }
-        }
-        
-        function refreshLatencyCharts() {
-            const interfaces = ['eth0', 'eth1']; // Get from config
-            const container = document.getElementById('latency-charts');
-            
-            let html = '';
-            interfaces.forEach(iface => {
-                html += `
-                    <div style="margin: 20px 0;">
-                        <h4>${iface} - Latency (${currentTimeRange})</h4>
-                        <div class="chart-container">
-                            <canvas id="latency-chart-${iface}"></canvas>
-                        </div>
-                    </div>
-                `;
-            });
-            
-            container.innerHTML = html;
-            
-            // Create charts
-            interfaces.forEach(iface => {
-                createLatencyChart(iface, currentTimeRange);
-            });
-        }
-        
-        function createLatencyChart(interface, timeRange) {
-            fetch(`/api/latency/graph/${interface}/${timeRange}`)
-                .then(response => response.json())
-                .then(data => {
-                    if (data.error) {
-                        console.error('Failed to get latency data:', data.error);
-                        return;
-                    }
-                    
-                    const ctx = document.getElementById(`latency-chart-${interface}`);
-                    if (!ctx) return;
-                    
-                    // Destroy existing chart if it exists
-                    if (charts[interface]) {
-                        charts[interface].destroy();
-                    }
-                    
-                    charts[interface] = new Chart(ctx, {
-                        type: 'line',
-                        data: {
-                            labels: data.labels || [],
-                            datasets: [{
-                                label: 'Latency (ms)',
-                                data: data.latency_data || [],
-                                borderColor: '#3498db',
-                                backgroundColor: 'rgba(52, 152, 219, 0.1)',
-                                tension: 0.4,
-                                fill: true
-                            }, {
-                                label: 'Packet Loss (%)',
-                                data: data.packet_loss_data || [],
-                                borderColor: '#e74c3c',
-                                backgroundColor: 'rgba(231, 76, 60, 0.1)',
-                                tension: 0.4,
-                                yAxisID: 'y1'
-                            }]
-                        },
-                        options: {
-                            responsive: true,
-                            maintainAspectRatio: false,
-                            scales: {
-                                y: {
-                                    beginAtZero: true,
-                                    title: {
-                                        display: true,
-                                        text: 'Latency (ms)'
-                                    }
-                                },
-                                y1: {
-                                    type: 'linear',
-                                    display: true,
-                                    position: 'right',
-                                    beginAtZero: true,
-                                    max: 100,
-                                    title: {
-                                        display: true,
-                                        text: 'Packet Loss (%)'
-                                    },
-                                    grid: {
-                                        drawOnChartArea: false,
-                                    },
-                                }
-                            },
-                            plugins: {
-                                title: {
-                                    display: true,
-                                    text: `${interface} - Latency Monitor`
-                                }
-                            }
-                        }
-                    });
-                })
-                .catch(error => {
-                    console.error('Failed to create latency chart:', error);
-                });
-        }
-        
-        function changeTimeRange(timeRange) {
-            currentTimeRange = timeRange;
-            
-            // Update active button
-            document.querySelectorAll('.time-btn').forEach(btn => {
-                btn.classList.remove('active');
-            });
-            event.target.classList.add('active');
-            
-            refreshLatencyCharts();
-        }
-        
-        function refreshNetworkStats() {
-            fetch('/api/network-stats')
-                .then(response => response.json())
-                .then(data => {
-                    const container = document.getElementById('network-stats');
-                    
-                    if (data.error) {
-                        container.innerHTML = `<div class="alert alert-danger">Error: ${data.error}</div>`;
-                        return;
-                    }
-                    
-                    let html = '<div class="metric-grid">';
-                    const interfaces = data.interfaces || {};
-                    
-                    for (const [iface, stats] of Object.entries(interfaces)) {
-                        html += `
-                            <div class="metric-card">
-                                <div class="metric-value">${iface}</div>
-                                <div class="metric-label">Interface</div>
-                                <div style="margin-top: 10px; font-size: 0.8em;">
-                                    RX: ${stats.rx_packets || 0} packets<br>
-                                    TX: ${stats.tx_packets || 0} packets<br>
-                                    Status: ${stats.status || 'Unknown'}
-                                </div>
-                            </div>
-                        `;
-                    }
-                    
-                    html += '</div>';
-                    container.innerHTML = html;
-                })
-                .catch(error => {
-                    console.error('Failed to refresh network stats:', error);
-                });
-        }
-        
-        function refreshLogs() {
-            fetch('/api/logs?lines=50')
-                .then(response => response.json())
-                .then(data => {
-                    const logsContainer = document.getElementById('system-logs');
-                    logsContainer.innerHTML = data.logs || 'No logs available';
-                    logsContainer.scrollTop = logsContainer.scrollHeight;
-                })
-                .catch(error => {
-                    console.error('Failed to refresh logs:', error);
-                });
-        }
-        
-        function controlInterface(interface, action) {
-            // Show confirmation dialog for disable action
-            if (action === 'disable') {
-                if (!confirm(`Are you sure you want to DISABLE interface ${interface}? This will remove it from the load balancing pool.`)) {
-                    return;
-                }
-            }
-            
-            // Show loading state
-            const buttons = document.querySelectorAll(`button[onclick*="controlInterface('${interface}'"]`);
-            buttons.forEach(btn => btn.disabled = true);
-            
-            fetch(`/api/interface/${interface}/${action}`)
-                .then(response => response.json())
-                .then(data => {
-                    if (data.success) {
-                        showAlert('success', data.message);
-                        refreshStatus();
-                    } else {
-                        showAlert('danger', data.error || 'Operation failed');
-                    }
-                })
-                .catch(error => {
-                    showAlert('danger', 'Failed to control interface');
-                })
-                .finally(() => {
-                    // Re-enable buttons
-                    buttons.forEach(btn => btn.disabled = false);
-                });
-        }
-        
-        function startWatchdog() {
-            fetch('/api/watchdog/start')
-                .then(response => response.json())
-                .then(data => {
-                    showAlert(data.success ? 'success' : 'danger', 
-                             data.message || (data.success ? 'Watchdog started' : 'Failed to start watchdog'));
-                    refreshStatus();
-                });
-        }
-        
-        function stopWatchdog() {
-            fetch('/api/watchdog/stop')
-                .then(response => response.json())
-                .then(data => {
-                    showAlert(data.success ? 'success' : 'danger', 
-                             data.message || (data.success ? 'Watchdog stopped' : 'Failed to stop watchdog'));
-                    refreshStatus();
-                });
-        }
-        
-        function restartWatchdog() {
-            fetch('/api/watchdog/restart')
-                .then(response => response.json())
-                .then(data => {
-                    showAlert(data.success ? 'success' : 'danger', 
-                             data.message || (data.success ? 'Watchdog restarted' : 'Failed to restart watchdog'));
-                    refreshStatus();
-                });
-        }
-        
-        function exportLatencyData(interface) {
-            window.open(`/api/latency/export/${interface}?format=csv&hours=24`, '_blank');
-        }
-        
-        function exportLogs() {
-            // Implementation for log export
-            showAlert('info', 'Log export feature coming soon');
-        }
-        
-        function showAlert(type, message) {
-            const alertDiv = document.createElement('div');
-            alertDiv.className = `alert alert-${type}`;
-            alertDiv.textContent = message;
-            
-            const container = document.querySelector('.container');
-            container.insertBefore(alertDiv, container.firstChild);
-            
-            setTimeout(() => {
-                alertDiv.remove();
-            }, 5000);
-        }
-        
-        function formatUptime(seconds) {
-            const hours = Math.floor(seconds / 3600);
-            const minutes = Math.floor((seconds % 3600) / 60);
-            return `${hours}h ${minutes}m`;
-        }
-        
-        function formatTimeAgo(timestamp) {
-            const date = new Date(timestamp);
-            const now = new Date();
-            const diff = now - date;
-            
-            if (diff < 60000) return 'Just now';
-            if (diff < 3600000) return `${Math.floor(diff / 60000)}m ago`;
-            if (diff < 86400000) return `${Math.floor(diff / 3600000)}h ago`;
-            
-            return date.toLocaleString();
-        }
-        
-        // WAN Management Functions
-        function showWANManagement() {
-            refreshAvailableInterfaces();
-        }
-        
-        function refreshAvailableInterfaces() {
-            fetch('/api/wan/available')
-                .then(response => response.json())
-                .then(data => {
-                    updateWANManagementInterface(data.interfaces);
-                })
-                .catch(error => {
-                    console.error('Failed to refresh available interfaces:', error);
-                    document.getElementById('wan-management').innerHTML = 
-                        '<div class="alert alert-danger">Failed to load available interfaces</div>';
-                });
-        }
-        
-        function updateWANManagementInterface(interfaces) {
-            const container = document.getElementById('wan-management');
-            
-            if (interfaces.length === 0) {
-                container.innerHTML = '<div class="alert alert-info">No available interfaces for WAN configuration</div>';
-                return;
-            }
-            
-            let html = '<div class="available-interfaces">';
-            interfaces.forEach(iface => {
-                html += `
-                    <div class="interface-card">
-                        <div style="display: flex; justify-content: space-between; align-items: center;">
-                            <strong>${iface.name}</strong>
-                            <span class="status-indicator ${iface.status === 'UP' ? 'status-healthy' : 'status-failed'}"></span>
-                        </div>
-                        <div style="font-size: 0.9em; color: #666; margin: 10px 0;">
-                            <div>MAC: ${iface.mac_address}</div>
-                            <div>Status: ${iface.status}</div>
-                            <div>Speed: ${iface.speed || 'Unknown'}</div>
-                            <div>IP: ${iface.ip_address || 'No IP'}</div>
-                        </div>
-                        <div class="controls">
-                            <button class="btn btn-sm btn-success" onclick="suggestWANConfig('${iface.name}')">Configure</button>
-                            <button class="btn btn-sm btn-primary" onclick="testConnectivity('${iface.name}')">Test</button>
-                        </div>
-                    </div>
-                `;
-            });
-            html += '</div>';
-            
-            container.innerHTML = html;
-        }
-        
-        function suggestWANConfig(interfaceName) {
-            fetch(`/api/wan/suggest/${interfaceName}`)
-                .then(response => response.json())
-                .then(data => {
-                    if (data.error) {
-                        showAlert('danger', data.error);
-                        return;
-                    }
-                    
-                    showWANConfigDialog(data, interfaceName);
-                })
-                .catch(error => {
-                    showAlert('danger', 'Failed to get configuration suggestion');
-                });
-        }
-        
-        function showWANConfigDialog(suggestion, interfaceName) {
-            const modal = document.createElement('div');
-            modal.className = 'wan-config-modal';
-            modal.innerHTML = `
-                <div class="modal-content">
-                    <h3>Configure WAN Interface: ${interfaceName}</h3>
-                    <form id="wan-config-form">
-                        <div class="form-group">
-                            <label>Gateway:</label>
-                            <input type="text" id="gateway" value="${suggestion.gateway}" required>
-                        </div>
-                        <div class="form-group">
-                            <label>Weight:</label>
-                            <select id="weight">
-                                ${suggestion.weight_options.map(w => 
-                                    `<option value="${w}" ${w === suggestion.weight ? 'selected' : ''}>${w}</option>`
-                                ).join('')}
-                            </select>
-                        </div>
-                        <div class="form-group">
-                            <label>DNS Servers:</label>
-                            <select id="dns">
-                                ${suggestion.dns_options.map((dns, i) => 
-                                    `<option value="${dns.join(',')}" ${i === 0 ? 'selected' : ''}>${dns.join(', ')}</option>`
-                                ).join('')}
-                            </select>
-                        </div>
-                        <div class="form-group">
-                            <label>Description:</label>
-                            <input type="text" id="description" value="${suggestion.description}">
-                        </div>
-                        <div class="form-actions">
-                            <button type="submit" class="btn btn-success">Add WAN Interface</button>
-                            <button type="button" class="btn btn-secondary" onclick="closeModal()">Cancel</button>
-                        </div>
-                    </form>
-                </div>
-            `;
-            
-            document.body.appendChild(modal);
-            
-            // Handle form submission
-            document.getElementById('wan-config-form').addEventListener('submit', function(e) {
-                e.preventDefault();
-                addWANInterface(interfaceName, {
-                    name: interfaceName,
-                    gateway: document.getElementById('gateway').value,
-                    weight: parseInt(document.getElementById('weight').value),
-                    dns: document.getElementById('dns').value.split(','),
-                    description: document.getElementById('description').value
-                });
-            });
-        }
-        
-        function addWANInterface(interfaceName, config) {
-            fetch('/api/wan/add', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                },
-                body: JSON.stringify(config)
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.success) {
-                    showAlert('success', data.message);
-                    closeModal();
-                    refreshAvailableInterfaces();
-                    refreshStatus();
-                } else {
-                    showAlert('danger', data.error || 'Failed to add interface');
-                }
-            })
-            .catch(error => {
-                showAlert('danger', 'Failed to add WAN interface');
-            });
-        }
-        
-        function testConnectivity(interfaceName) {
-            fetch(`/api/wan/test-connectivity/${interfaceName}`)
-                .then(response => response.json())
-                .then(data => {
-                    if (data.success) {
-                        showAlert('success', `Connectivity test for ${interfaceName}: ${data.result}`);
-                    } else {
-                        showAlert('warning', `Connectivity test for ${interfaceName}: ${data.error}`);
-                    }
-                })
-                .catch(error => {
-                    showAlert('danger', 'Failed to test connectivity');
-                });
-        }
-        
-        function autoDetectPrimaryWAN() {
-            if (!confirm('This will auto-detect and configure the primary WAN interface. Continue?')) {
-                return;
-            }
-            
-            fetch('/api/wan/auto-detect', {
-                method: 'POST'
-            })
-            .then(response => response.json())
-            .then(data => {
-                if (data.error) {
-                    showAlert('danger', data.error);
-                } else {
-                    showAlert('success', `Primary WAN detected: ${data.primary_wan.name}`);
-                    refreshAvailableInterfaces();
-                    refreshStatus();
-                }
-            })
-            .catch(error => {
-                showAlert('danger', 'Failed to auto-detect primary WAN');
-            });
-        }
-        
-        function closeModal() {
-            const modal = document.querySelector('.wan-config-modal');
-            if (modal) {
-                modal.remove();
-            }
-        }
-        
-        // Cleanup on page unload
-        window.addEventListener('beforeunload', function() {
-            if (statusUpdateInterval) {
-                clearInterval(statusUpdateInterval);
-            }
-        });
-    </script>
-</body>
-</html>'''
-    
-    with open(template_path, 'w') as f:
-        f.write(html_content)
-
 def main():
     """Main function to run the enhanced web interface"""
     import argparse
@@ -1330,15 +849,31 @@ def main():
     parser.add_argument('--host', default='0.0.0.0', help='Host to bind to')
     parser.add_argument('--port', type=int, default=8080, help='Port to bind to')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--threads', type=int, default=16,
+                        help='Worker threads; each open dashboard holds one for its event stream')
     
     args = parser.parse_args()
     
     logger.info(f"Starting Enhanced RouterOS Web Interface on {args.host}:{args.port}")
     
-    # Create enhanced dashboard template
-    create_enhanced_dashboard()
+    if args.debug:
+        # The reloader parent never serves; the child starts on first request
+        app.run(host=args.host, port=args.port, debug=True)
+        return
+    
+    web_interface.start()
+    
+    # Production: one process (the latency monitor and its SQLite writer must not
+    # be duplicated per worker) serving requests from a thread pool
+    try:
+        import waitress
+    except ImportError:
+        logger.warning("waitress not installed, falling back to threaded development server")
+        app.run(host=args.host, port=args.port, threaded=True)
+        return
     
-    app.run(host=args.host, port=args.port, debug=args.debug)
+    waitress.serve(app, host=args.host, port=args.port, threads=args.threads,
+                   connection_limit=500)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
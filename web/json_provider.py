@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Smart Multi-WAN Router OS - Flask JSON Provider
+Serializes API responses with orjson when it is installed
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to stdlib json
+    orjson = None
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, falling back to Flask's default"""
+
+    option = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def dumps_bytes(self, obj, indent: bool = False) -> bytes:
+        """Serialize obj to UTF-8 JSON bytes, optionally indented by 2 spaces"""
+        if orjson is None:
+            return (super().dumps(obj, indent=2) if indent else super().dumps(obj)).encode()
+        option = self.option | orjson.OPT_INDENT_2 if indent else self.option
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        # Hand orjson's bytes straight to the response, skipping str encode
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
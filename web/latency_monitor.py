@@ -5,20 +5,56 @@ Provides real-time latency monitoring, graphing, and historical data analysis
 """
 
 import time
+import csv
+import io
 import json
 import logging
+import logging.handlers
 import sqlite3
 import threading
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
-from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+from dataclasses import dataclass
+from types import MappingProxyType
+from array import array
+from concurrent.futures import ThreadPoolExecutor
 import subprocess
 import os
+import re
+import select
+import socket
+import struct
+
+ICMP_ECHO_REQUEST = 8
+ICMP_ECHO_REPLY = 0
+RETENTION_INTERVAL = 3600  # seconds between retention sweeps
+# ping(8) summary lines, matched on the raw output bytes
+_PING_LOSS_RE = re.compile(rb'([\d.]+)% packet loss')
+_PING_RTT_RE = re.compile(rb'(?:rtt|round-trip) [^=]*= *[\d.]+/([\d.]+)/')
+
+logger = logging.getLogger(__name__)
+
+def _configure_logger():
+    """Attach file and console handlers to the module logger once"""
+    if logger.handlers:
+        return
+    logger.setLevel(logging.INFO)
+    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handlers = [logging.StreamHandler()]
+    try:
+        handlers.append(logging.handlers.RotatingFileHandler(
+            '/var/log/routeros-latency.log', maxBytes=10_000_000, backupCount=3
+        ))
+    except OSError:
+        pass  # no writable log dir; console only
+    for handler in handlers:
+        handler.setFormatter(formatter)
+        logger.addHandler(handler)
 
 @dataclass
 class LatencyDataPoint:
     """Represents a single latency measurement"""
+    __slots__ = ('timestamp', 'interface', 'latency', 'packet_loss', 'status', 'target')
+    
     timestamp: float
     interface: str
     latency: float
@@ -26,19 +62,151 @@ class LatencyDataPoint:
     status: str
     target: str
 
+class RealtimeBuffer:
+    """Fixed-size ring of recent samples for one interface, stored column-wise
+    
+    Numeric columns live in preallocated C double arrays instead of one
+    LatencyDataPoint object per sample; slot = sample count modulo size.
+    """
+    
+    __slots__ = ('interface', 'size', 'count', 'timestamps', 'latencies',
+                 'packet_loss', 'statuses', 'targets')
+    
+    def __init__(self, interface: str, size: int):
+        self.interface = interface
+        self.size = size
+        self.count = 0
+        self.timestamps = array('d', bytes(8 * size))
+        self.latencies = array('d', bytes(8 * size))
+        self.packet_loss = array('d', bytes(8 * size))
+        self.statuses: List[Optional[str]] = [None] * size
+        self.targets: List[Optional[str]] = [None] * size
+    
+    def append(self, data_point: LatencyDataPoint):
+        """Store a sample, overwriting the oldest once the ring is full"""
+        i = self.count % self.size
+        self.timestamps[i] = data_point.timestamp
+        self.latencies[i] = data_point.latency
+        self.packet_loss[i] = data_point.packet_loss
+        self.statuses[i] = data_point.status
+        self.targets[i] = data_point.target
+        self.count += 1
+    
+    def _first_at(self, cutoff_time: float) -> int:
+        """Sample number of the oldest retained sample at or after cutoff_time
+        
+        Samples are appended in time order, so this is a binary search.
+        """
+        size = self.size
+        lo, hi = max(0, self.count - size), self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.timestamps[mid % size] < cutoff_time:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+    
+    def since(self, cutoff_time: float) -> List[Dict]:
+        """Samples at or after cutoff_time, oldest first"""
+        size = self.size
+        end = self.count
+        lo = self._first_at(cutoff_time)
+        return [{
+            'timestamp': self.timestamps[i],
+            'interface': self.interface,
+            'latency': self.latencies[i],
+            'packet_loss': self.packet_loss[i],
+            'status': self.statuses[i],
+            'target': self.targets[i]
+        } for i in (n % size for n in range(lo, end))]
+    
+    def last(self) -> Optional[Tuple]:
+        """(latency, packet_loss, status, timestamp) of the newest sample, or None"""
+        if self.count == 0:
+            return None
+        i = (self.count - 1) % self.size
+        return self.latencies[i], self.packet_loss[i], self.statuses[i], self.timestamps[i]
+    
+    def aggregate(self, cutoff_time: float) -> Optional[Tuple]:
+        """Summary of samples at or after cutoff_time, shaped like the SQL summary row
+        
+        Returns (count, avg latency, min, max, avg packet loss, healthy,
+        degraded, down), or None when older samples in the window may have
+        been overwritten already.
+        """
+        size = self.size
+        end = self.count
+        oldest = max(0, end - size)
+        if end == oldest or self.timestamps[oldest % size] >= cutoff_time:
+            return None
+        
+        lo = self._first_at(cutoff_time)
+        total = end - lo
+        if total == 0:
+            return (0, None, None, None, None, 0, 0, 0)
+        
+        # The window is one or two contiguous runs of the ring; reduce each
+        # run with C-level sum/min/max over array slices
+        start, stop = lo % size, end % size
+        runs = [(start, stop)] if start < stop else [(start, size), (0, stop)]
+        latencies = [self.latencies[a:b] for a, b in runs if a < b]
+        statuses = [s for a, b in runs for s in self.statuses[a:b]]
+        return (total,
+                sum(sum(run) for run in latencies) / total,
+                min(min(run) for run in latencies),
+                max(max(run) for run in latencies),
+                sum(sum(self.packet_loss[a:b]) for a, b in runs) / total,
+                statuses.count('healthy'),
+                statuses.count('degraded'),
+                statuses.count('down'))
+
 class LatencyMonitor:
     """Real-time latency monitoring and graphing system"""
     
+    # Payloads for interfaces without data; copied per call, never mutated
+    _EMPTY_SUMMARY = MappingProxyType({
+        'total_samples': 0,
+        'avg_latency': 0,
+        'min_latency': 0,
+        'max_latency': 0,
+        'avg_packet_loss': 0,
+        'uptime_percentage': 0,
+        'healthy_samples': 0,
+        'degraded_samples': 0,
+        'down_samples': 0
+    })
+    _UNKNOWN_STATUS = MappingProxyType({
+        'current_latency': 0,
+        'current_packet_loss': 0,
+        'status': 'unknown',
+        'last_check_age_minutes': 999,
+        'is_recent': False
+    })
+    
     def __init__(self, db_path: str = "/opt/routeros/web/latency_data.db", 
                  max_data_points: int = 1000):
         self.db_path = db_path
         self.max_data_points = max_data_points
-        self.logger = logging.getLogger(__name__)
+        _configure_logger()
+        self.logger = logger
         
         # Real-time data storage
-        self.realtime_data: Dict[str, deque] = {}
+        self.realtime_data: Dict[str, RealtimeBuffer] = {}
         self.monitoring_active = False
         self.monitor_thread = None
+        self._ping_pool = None  # created on first collection, sized to the probe count
+        self._icmp_available = True  # cleared once the kernel refuses ICMP sockets
+        self._write_conn = None  # long-lived writer connection, opened by _setup_database
+        self._db_lock = threading.Lock()  # serializes use of the writer connection
+        self._local = threading.local()  # per-thread read connection, see _read_conn
+        # Running per-(interface, target, hour) aggregates, updated as samples
+        # are stored: the finished hour is written to latency_summary on
+        # rollover, and the retained hours answer get_summary_statistics
+        self._rollups: Dict[Tuple[str, str, int], List[float]] = {}
+        self._current_hour = None
+        self._rollup_start = None  # first hour the rollups hold completely
+        self._next_cleanup = 0.0  # monotonic time the next retention sweep is due
         
         # Configuration
         self.config = {
@@ -50,25 +218,17 @@ class LatencyMonitor:
         }
         
         self._setup_database()
-        self._setup_logging()
-    
-    def _setup_logging(self):
-        """Configure logging for latency monitor"""
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler('/var/log/routeros-latency.log'),
-                logging.StreamHandler()
-            ]
-        )
     
     def _setup_database(self):
         """Initialize SQLite database for latency data storage"""
         try:
             os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
             
-            conn = sqlite3.connect(self.db_path)
+            # Kept open for all writes; WAL lets readers on their own
+            # connections run alongside it, and NORMAL syncs only at checkpoints
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
             cursor = conn.cursor()
             
             # Create latency data table
@@ -89,8 +249,10 @@ class LatencyMonitor:
             cursor.execute('''
                 CREATE INDEX IF NOT EXISTS idx_timestamp ON latency_data(timestamp)
             ''')
+            # Every query filtering on interface also bounds timestamp, which
+            # idx_interface_timestamp serves; one less index to update per insert
             cursor.execute('''
-                CREATE INDEX IF NOT EXISTS idx_interface ON latency_data(interface)
+                DROP INDEX IF EXISTS idx_interface
             ''')
             cursor.execute('''
                 CREATE INDEX IF NOT EXISTS idx_interface_timestamp ON latency_data(interface, timestamp)
@@ -114,7 +276,7 @@ class LatencyMonitor:
             ''')
             
             conn.commit()
-            conn.close()
+            self._write_conn = conn
             
             self.logger.info("Database initialized successfully")
             
@@ -122,50 +284,46 @@ class LatencyMonitor:
             self.logger.error(f"Failed to setup database: {e}")
             raise
     
+    def _read_conn(self) -> sqlite3.Connection:
+        """This thread's read connection, opened on first use and kept
+        
+        Reads stay in autocommit mode, so each query sees the latest
+        committed rows; WAL keeps them from blocking the writer.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            self._local.conn = conn
+        return conn
+    
     def _run_ping_test(self, interface: str, target: str) -> Tuple[float, float, str]:
         """
         Run ping test and return latency, packet loss, and status
         Returns: (latency_ms, packet_loss_percentage, status)
         """
+        if self._icmp_available:
+            result = self._icmp_ping(interface, target)
+            if result is not None:
+                return result
+        
         try:
             cmd = [
                 'ping', '-I', interface, '-c', '3', '-W', str(self.config['timeout_seconds']),
                 '-q', target
             ]
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
+            result = subprocess.run(cmd, capture_output=True, timeout=10)
             
             if result.returncode != 0:
                 return 0.0, 100.0, 'failed'
             
-            # Parse ping output
-            output_lines = result.stdout.strip().split('\n')
-            latency = 0.0
-            packet_loss = 0.0
-            
-            for line in output_lines:
-                if 'packet loss' in line:
-                    parts = line.split(',')
-                    for part in parts:
-                        if 'packet loss' in part:
-                            packet_loss = float(part.strip().split('%')[0])
-                            break
-                
-                if 'rtt' in line and 'avg' in line:
-                    parts = line.split('=')[1].strip().split('/')
-                    if len(parts) >= 2:
-                        latency = float(parts[1])
-                    break
-            
-            # Determine status
-            if packet_loss >= 100.0:
-                status = 'down'
-            elif packet_loss > 5.0 or latency > 2000:
-                status = 'degraded'
-            else:
-                status = 'healthy'
+            # Parse ping output: two C-level searches, no decoding or splitting
+            match = _PING_LOSS_RE.search(result.stdout)
+            packet_loss = float(match.group(1)) if match else 0.0
+            match = _PING_RTT_RE.search(result.stdout)
+            latency = float(match.group(1)) if match else 0.0
             
-            return latency, packet_loss, status
+            return latency, packet_loss, self._ping_status(latency, packet_loss)
             
         except subprocess.TimeoutExpired:
             return 0.0, 100.0, 'timeout'
@@ -173,92 +331,186 @@ class LatencyMonitor:
             self.logger.error(f"Ping test failed for {interface}->{target}: {e}")
             return 0.0, 100.0, 'error'
     
+    def _icmp_ping(self, interface: str, target: str,
+                   count: int = 3) -> Optional[Tuple[float, float, str]]:
+        """
+        Ping over an unprivileged ICMP socket instead of forking ping(8)
+        Returns None when the kernel does not allow ICMP sockets for this
+        process (net.ipv4.ping_group_range); ping(8) is used from then on.
+        """
+        try:
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP)
+        except OSError as e:
+            self._icmp_available = False
+            self.logger.info(f"ICMP sockets unavailable ({e}), falling back to ping")
+            return None
+        
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_BINDTODEVICE, interface.encode())
+        except OSError as e:
+            # Missing interface or no privilege to bind; let ping(8) report it
+            sock.close()
+            self.logger.debug(f"Cannot bind ICMP socket to {interface}: {e}")
+            return None
+        
+        timeout = self.config['timeout_seconds']
+        rtts = []
+        try:
+            for seq in range(count):
+                # The kernel fills in the identifier and checksum for ping sockets
+                sock.sendto(struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, 0, seq), (target, 0))
+                sent = time.monotonic()
+                deadline = sent + timeout
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not select.select([sock], [], [], remaining)[0]:
+                        break
+                    reply = sock.recv(1024)
+                    if (len(reply) >= 8 and reply[0] == ICMP_ECHO_REPLY
+                            and struct.unpack_from('!H', reply, 6)[0] == seq):
+                        rtts.append((time.monotonic() - sent) * 1000)
+                        break
+        except OSError as e:
+            if not rtts:
+                self.logger.debug(f"ICMP ping failed for {interface}->{target}: {e}")
+                return 0.0, 100.0, 'failed'
+        finally:
+            sock.close()
+        
+        if not rtts:
+            return 0.0, 100.0, 'failed'
+        
+        latency = round(sum(rtts) / len(rtts), 3)
+        packet_loss = round(100.0 * (count - len(rtts)) / count, 1)
+        return latency, packet_loss, self._ping_status(latency, packet_loss)
+    
+    @staticmethod
+    def _ping_status(latency: float, packet_loss: float) -> str:
+        """Classify a probe result"""
+        if packet_loss >= 100.0:
+            return 'down'
+        elif packet_loss > 5.0 or latency > 2000:
+            return 'degraded'
+        return 'healthy'
+    
     def collect_latency_data(self):
         """Collect latency data for all interfaces and targets"""
         current_time = time.time()
+        data_points = []
         
-        for interface in self.config['interfaces']:
-            for target in self.config['ping_targets']:
-                try:
-                    latency, packet_loss, status = self._run_ping_test(interface, target)
-                    
-                    data_point = LatencyDataPoint(
-                        timestamp=current_time,
-                        interface=interface,
-                        target=target,
-                        latency=latency,
-                        packet_loss=packet_loss,
-                        status=status
-                    )
-                    
-                    # Store in real-time buffer
-                    if interface not in self.realtime_data:
-                        self.realtime_data[interface] = deque(maxlen=self.max_data_points)
-                    
-                    self.realtime_data[interface].append(data_point)
-                    
-                    # Store in database
-                    self._store_data_point(data_point)
-                    
-                    self.logger.debug(f"Latency data collected: {interface}->{target} "
-                                    f"({latency:.1f}ms, {packet_loss:.1f}% loss, {status})")
-                    
-                except Exception as e:
-                    self.logger.error(f"Failed to collect latency data for {interface}->{target}: {e}")
+        # Pings spend their time waiting on the network; run them all at once
+        # so a cycle takes as long as the slowest probe, not the sum of them
+        probes = [(interface, target)
+                  for interface in self.config['interfaces']
+                  for target in self.config['ping_targets']]
+        if self._ping_pool is None:
+            self._ping_pool = ThreadPoolExecutor(max_workers=max(1, len(probes)),
+                                                 thread_name_prefix='ping')
+        futures = [self._ping_pool.submit(self._run_ping_test, interface, target)
+                   for interface, target in probes]
+        
+        for (interface, target), future in zip(probes, futures):
+            try:
+                latency, packet_loss, status = future.result()
+                
+                data_point = LatencyDataPoint(
+                    timestamp=current_time,
+                    interface=interface,
+                    target=target,
+                    latency=latency,
+                    packet_loss=packet_loss,
+                    status=status
+                )
+                
+                # Store in real-time buffer
+                if interface not in self.realtime_data:
+                    self.realtime_data[interface] = RealtimeBuffer(interface, self.max_data_points)
+                
+                self.realtime_data[interface].append(data_point)
+                data_points.append(data_point)
+                
+                self.logger.debug(f"Latency data collected: {interface}->{target} "
+                                f"({latency:.1f}ms, {packet_loss:.1f}% loss, {status})")
+                
+            except Exception as e:
+                self.logger.error(f"Failed to collect latency data for {interface}->{target}: {e}")
+        
+        # Store the whole cycle in one transaction
+        self._store_data_points(data_points)
     
-    def _store_data_point(self, data_point: LatencyDataPoint):
-        """Store data point in database"""
+    def _store_data_points(self, data_points: List[LatencyDataPoint]):
+        """Store data points in database"""
+        if not data_points:
+            return
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO latency_data (timestamp, interface, target, latency, packet_loss, status)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (data_point.timestamp, data_point.interface, data_point.target,
-                  data_point.latency, data_point.packet_loss, data_point.status))
-            
-            conn.commit()
-            conn.close()
+            # created_at only repeats timestamp as text; an explicit NULL takes
+            # no space in the record, saving ~20 bytes on every row
+            with self._db_lock, self._write_conn as conn:
+                conn.executemany('''
+                    INSERT INTO latency_data
+                    (timestamp, interface, target, latency, packet_loss, status, created_at)
+                    VALUES (?, ?, ?, ?, ?, ?, NULL)
+                ''', [(p.timestamp, p.interface, p.target, p.latency, p.packet_loss, p.status)
+                      for p in data_points])
+                self._accumulate_hourly(conn, data_points)
             
         except Exception as e:
-            self.logger.error(f"Failed to store data point: {e}")
+            self.logger.error(f"Failed to store data points: {e}")
     
     def _monitoring_loop(self):
         """Main monitoring loop"""
         self.logger.info("Latency monitoring started")
         
+        # Fixed-rate schedule on the monotonic clock: samples are
+        # check_interval apart however long a cycle's probes take
+        deadline = time.monotonic()
         while self.monitoring_active:
             try:
-                self.collect_latency_data()
+                deadline += self.config['check_interval']
                 
-                # Clean up old data
-                self._cleanup_old_data()
+                self.run_cycle()
                 
-                # Generate hourly summaries
-                self._generate_hourly_summaries()
-                
-                time.sleep(self.config['check_interval'])
+                delay = deadline - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    # Overran the interval; resync instead of bursting to catch up
+                    deadline = time.monotonic()
                 
             except Exception as e:
                 self.logger.error(f"Error in monitoring loop: {e}")
                 time.sleep(self.config['check_interval'])
+                deadline = time.monotonic()
         
         self.logger.info("Latency monitoring stopped")
     
+    def run_cycle(self):
+        """One monitoring cycle: probe every interface and target, then apply retention
+        
+        For callers that drive the schedule themselves instead of start_monitoring().
+        """
+        self.collect_latency_data()
+        
+        # Clean up old data
+        self._cleanup_old_data()
+    
     def _cleanup_old_data(self):
-        """Remove old data beyond retention period"""
+        """Remove old data beyond retention period
+        
+        Runs at most every RETENTION_INTERVAL, so expired rows go in one
+        hour-sized range delete instead of a few rows every cycle.
+        """
+        now = time.monotonic()
+        if now < self._next_cleanup:
+            return
+        self._next_cleanup = now + RETENTION_INTERVAL
+        
         try:
             cutoff_time = time.time() - (self.config['graph_retention_hours'] * 3600)
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('DELETE FROM latency_data WHERE timestamp < ?', (cutoff_time,))
-            deleted_rows = cursor.rowcount
-            
-            conn.commit()
-            conn.close()
+            with self._db_lock, self._write_conn as conn:
+                deleted_rows = conn.execute('DELETE FROM latency_data WHERE timestamp < ?',
+                                            (cutoff_time,)).rowcount
             
             if deleted_rows > 0:
                 self.logger.info(f"Cleaned up {deleted_rows} old latency data points")
@@ -266,59 +518,103 @@ class LatencyMonitor:
         except Exception as e:
             self.logger.error(f"Failed to cleanup old data: {e}")
     
-    def _generate_hourly_summaries(self):
-        """Generate hourly summary statistics"""
-        try:
-            current_hour = int(time.time() // 3600) * 3600
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Check if summaries already exist for this hour
-            cursor.execute('''
-                SELECT COUNT(*) FROM latency_summary 
-                WHERE hour_timestamp = ?
-            ''', (current_hour,))
-            
-            if cursor.fetchone()[0] > 0:
-                return  # Already summarized
-            
-            # Generate summaries for each interface and target
-            for interface in self.config['interfaces']:
-                for target in self.config['ping_targets']:
-                    cursor.execute('''
-                        SELECT 
-                            AVG(latency) as avg_latency,
-                            MIN(latency) as min_latency,
-                            MAX(latency) as max_latency,
-                            AVG(packet_loss) as avg_packet_loss,
-                            COUNT(*) as sample_count,
-                            SUM(CASE WHEN status = 'healthy' THEN 1 ELSE 0 END) as healthy_count
-                        FROM latency_data
-                        WHERE interface = ? AND target = ? 
-                        AND timestamp >= ? AND timestamp < ?
-                    ''', (interface, target, current_hour - 3600, current_hour))
-                    
-                    result = cursor.fetchone()
-                    if result and result[0] is not None:
-                        avg_latency, min_latency, max_latency, avg_packet_loss, sample_count, healthy_count = result
-                        uptime_percentage = (healthy_count / sample_count) * 100 if sample_count > 0 else 0
-                        
-                        cursor.execute('''
-                            INSERT INTO latency_summary 
-                            (interface, target, hour_timestamp, avg_latency, min_latency, max_latency, 
-                             avg_packet_loss, uptime_percentage, sample_count)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        ''', (interface, target, current_hour, avg_latency, min_latency, max_latency,
-                              avg_packet_loss, uptime_percentage, sample_count))
-            
-            conn.commit()
-            conn.close()
-            
-            self.logger.info("Hourly latency summaries generated")
-            
-        except Exception as e:
-            self.logger.error(f"Failed to generate hourly summaries: {e}")
+    def _accumulate_hourly(self, conn: sqlite3.Connection, data_points: List[LatencyDataPoint]):
+        """Fold samples into the running per-hour rollups, flushing on rollover
+        
+        Called with the writer connection held, inside the insert transaction.
+        """
+        for p in data_points:
+            hour = int(p.timestamp // 3600) * 3600
+            if self._current_hour is None:
+                # Rows stored before this process started are not in the
+                # first hour's rollups, so only later hours are complete
+                self._current_hour = hour
+                self._rollup_start = hour + 3600
+            elif hour > self._current_hour:
+                self._flush_hourly_summaries(conn)
+                self._current_hour = hour
+                self._prune_rollups(hour)
+            
+            # [count, latency sum, min, max, packet loss sum, healthy, degraded, down]
+            key = (p.interface, p.target, hour)
+            acc = self._rollups.get(key)
+            if acc is None:
+                acc = self._rollups[key] = [0, 0.0, p.latency, p.latency, 0.0, 0, 0, 0]
+            acc[0] += 1
+            acc[1] += p.latency
+            if p.latency < acc[2]:
+                acc[2] = p.latency
+            if p.latency > acc[3]:
+                acc[3] = p.latency
+            acc[4] += p.packet_loss
+            if p.status == 'healthy':
+                acc[5] += 1
+            elif p.status == 'degraded':
+                acc[6] += 1
+            elif p.status == 'down':
+                acc[7] += 1
+    
+    def _flush_hourly_summaries(self, conn: sqlite3.Connection):
+        """Write the finished hour's rollups to latency_summary"""
+        # Stamped with the end of the hour, as summaries always have been
+        hour_timestamp = self._current_hour + 3600
+        conn.executemany('''
+            INSERT INTO latency_summary 
+            (interface, target, hour_timestamp, avg_latency, min_latency, max_latency, 
+             avg_packet_loss, uptime_percentage, sample_count)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(interface, target, hour_timestamp, acc[1] / acc[0], acc[2], acc[3],
+               acc[4] / acc[0], acc[5] / acc[0] * 100, acc[0])
+              for (interface, target, hour), acc in self._rollups.items()
+              if hour == self._current_hour])
+        
+        self.logger.info("Hourly latency summaries generated")
+    
+    def _prune_rollups(self, current_hour: int):
+        """Drop rollups for hours whose samples have left the retention window"""
+        oldest = current_hour - self.config['graph_retention_hours'] * 3600
+        for key in [key for key in self._rollups if key[2] < oldest]:
+            del self._rollups[key]
+        self._rollup_start = max(self._rollup_start, oldest)
+    
+    def _rollup_summary(self, interface: str, cutoff_time: float) -> Optional[Tuple]:
+        """Summary row for samples at or after cutoff_time, built from the rollups
+        
+        Whole hours are summed from the rollups and only the window's leading
+        partial hour is read from the database. Returns None when the
+        rollups do not cover the window.
+        """
+        first_hour = int(cutoff_time // 3600) * 3600
+        if first_hour < cutoff_time:
+            first_hour += 3600
+        if self._rollup_start is None or first_hour < self._rollup_start:
+            return None
+        
+        with self._db_lock:
+            buckets = [tuple(acc) for (iface, _, hour), acc in self._rollups.items()
+                       if iface == interface and hour >= first_hour]
+        
+        head = self._read_conn().execute('''
+            SELECT 
+                COUNT(*), SUM(latency), MIN(latency), MAX(latency), SUM(packet_loss),
+                SUM(status = 'healthy'), SUM(status = 'degraded'), SUM(status = 'down')
+            FROM latency_data
+            WHERE interface = ? AND timestamp >= ? AND timestamp < ?
+        ''', (interface, cutoff_time, first_hour)).fetchone()
+        if head[0]:
+            buckets.append(head)
+        
+        total = sum(b[0] for b in buckets)
+        if total == 0:
+            return (0, None, None, None, None, 0, 0, 0)
+        return (total,
+                sum(b[1] for b in buckets) / total,
+                min(b[2] for b in buckets),
+                max(b[3] for b in buckets),
+                sum(b[4] for b in buckets) / total,
+                sum(b[5] for b in buckets),
+                sum(b[6] for b in buckets),
+                sum(b[7] for b in buckets))
     
     def get_realtime_data(self, interface: str, minutes: int = 60) -> List[Dict]:
         """Get realtime latency data for specified interface and time period"""
@@ -327,13 +623,7 @@ class LatencyMonitor:
                 return []
             
             cutoff_time = time.time() - (minutes * 60)
-            data = []
-            
-            for data_point in self.realtime_data[interface]:
-                if data_point.timestamp >= cutoff_time:
-                    data.append(asdict(data_point))
-            
-            return data
+            return self.realtime_data[interface].since(cutoff_time)
             
         except Exception as e:
             self.logger.error(f"Failed to get realtime data: {e}")
@@ -344,18 +634,12 @@ class LatencyMonitor:
         try:
             cutoff_time = time.time() - (hours * 3600)
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            results = self._read_conn().execute('''
                 SELECT timestamp, interface, target, latency, packet_loss, status
                 FROM latency_data
                 WHERE interface = ? AND timestamp >= ?
                 ORDER BY timestamp DESC
-            ''', (interface, cutoff_time))
-            
-            results = cursor.fetchall()
-            conn.close()
+            ''', (interface, cutoff_time)).fetchall()
             
             data = []
             for row in results:
@@ -374,30 +658,57 @@ class LatencyMonitor:
             self.logger.error(f"Failed to get historical data: {e}")
             return []
     
+    def iter_export_rows(self, interface: str, hours: int = 24,
+                         batch_size: int = 1000) -> Iterator[List[Tuple]]:
+        """Yield historical rows in batches without loading the whole range
+        
+        Rows are (timestamp, interface, target, latency, packet_loss, status)
+        tuples, newest first, as returned by get_historical_data.
+        """
+        cutoff_time = time.time() - (hours * 3600)
+        
+        cursor = self._read_conn().execute('''
+            SELECT timestamp, interface, target, latency, packet_loss, status
+            FROM latency_data
+            WHERE interface = ? AND timestamp >= ?
+            ORDER BY timestamp DESC
+        ''', (interface, cutoff_time))
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            # Release the read snapshot even if the export is abandoned
+            cursor.close()
+    
     def get_summary_statistics(self, interface: str, hours: int = 24) -> Dict:
         """Get summary statistics for specified interface and time period"""
         try:
             cutoff_time = time.time() - (hours * 3600)
             
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT 
-                    COUNT(*) as total_samples,
-                    AVG(latency) as avg_latency,
-                    MIN(latency) as min_latency,
-                    MAX(latency) as max_latency,
-                    AVG(packet_loss) as avg_packet_loss,
-                    SUM(CASE WHEN status = 'healthy' THEN 1 ELSE 0 END) as healthy_samples,
-                    SUM(CASE WHEN status = 'degraded' THEN 1 ELSE 0 END) as degraded_samples,
-                    SUM(CASE WHEN status = 'down' THEN 1 ELSE 0 END) as down_samples
-                FROM latency_data
-                WHERE interface = ? AND timestamp >= ?
-            ''', (interface, cutoff_time))
-            
-            result = cursor.fetchone()
-            conn.close()
+            # Short windows are answered from the realtime ring when it still
+            # holds every sample in them, longer ones from the hourly rollups;
+            # scanning the raw rows is the fallback
+            buffer = self.realtime_data.get(interface)
+            result = buffer.aggregate(cutoff_time) if buffer else None
+            if result is None:
+                result = self._rollup_summary(interface, cutoff_time)
+            if result is None:
+                result = self._read_conn().execute('''
+                    SELECT 
+                        COUNT(*) as total_samples,
+                        AVG(latency) as avg_latency,
+                        MIN(latency) as min_latency,
+                        MAX(latency) as max_latency,
+                        AVG(packet_loss) as avg_packet_loss,
+                        SUM(status = 'healthy') as healthy_samples,
+                        SUM(status = 'degraded') as degraded_samples,
+                        SUM(status = 'down') as down_samples
+                    FROM latency_data
+                    WHERE interface = ? AND timestamp >= ?
+                ''', (interface, cutoff_time)).fetchone()
             
             if result and result[0] > 0:
                 total_samples, avg_latency, min_latency, max_latency, avg_packet_loss, \
@@ -417,19 +728,7 @@ class LatencyMonitor:
                     'down_samples': down_samples
                 }
             else:
-                return {
-                    'interface': interface,
-                    'time_period_hours': hours,
-                    'total_samples': 0,
-                    'avg_latency': 0,
-                    'min_latency': 0,
-                    'max_latency': 0,
-                    'avg_packet_loss': 0,
-                    'uptime_percentage': 0,
-                    'healthy_samples': 0,
-                    'degraded_samples': 0,
-                    'down_samples': 0
-                }
+                return {'interface': interface, 'time_period_hours': hours, **self._EMPTY_SUMMARY}
                 
         except Exception as e:
             self.logger.error(f"Failed to get summary statistics: {e}")
@@ -439,44 +738,38 @@ class LatencyMonitor:
         """Get current status for all interfaces"""
         try:
             status = {}
+            # Wall clock, like the stored timestamps it is compared with
+            now = time.time()
             
             for interface in self.config['interfaces']:
-                # Get latest data point
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    SELECT latency, packet_loss, status, timestamp
-                    FROM latency_data
-                    WHERE interface = ?
-                    ORDER BY timestamp DESC
-                    LIMIT 1
-                ''', (interface,))
-                
-                result = cursor.fetchone()
-                conn.close()
+                # Latest data point: the newest realtime sample when there is
+                # one, otherwise (just started) the newest stored row
+                buffer = self.realtime_data.get(interface)
+                result = buffer.last() if buffer else None
+                if result is None:
+                    result = self._read_conn().execute('''
+                        SELECT latency, packet_loss, status, timestamp
+                        FROM latency_data
+                        WHERE interface = ?
+                        ORDER BY timestamp DESC
+                        LIMIT 1
+                    ''', (interface,)).fetchone()
                 
                 if result:
-                    latency, packet_loss, status, timestamp = result
+                    latency, packet_loss, current_status, timestamp = result
                     
                     # Calculate status age
-                    age_minutes = (time.time() - timestamp) / 60
+                    age_minutes = (now - timestamp) / 60
                     
                     status[interface] = {
                         'current_latency': round(latency, 2),
                         'current_packet_loss': round(packet_loss, 2),
-                        'status': status,
+                        'status': current_status,
                         'last_check_age_minutes': round(age_minutes, 1),
                         'is_recent': age_minutes < 10  # Consider recent if less than 10 minutes old
                     }
                 else:
-                    status[interface] = {
-                        'current_latency': 0,
-                        'current_packet_loss': 0,
-                        'status': 'unknown',
-                        'last_check_age_minutes': 999,
-                        'is_recent': False
-                    }
+                    status[interface] = dict(self._UNKNOWN_STATUS)
             
             return status
             
@@ -484,6 +777,17 @@ class LatencyMonitor:
             self.logger.error(f"Failed to get interface status: {e}")
             return {'error': str(e)}
     
+    def _graph_rows(self, interface: str, hours: int) -> List[Tuple]:
+        """(timestamp, latency, packet_loss, status) rows, newest first, as plain tuples"""
+        cutoff_time = time.time() - (hours * 3600)
+        
+        return self._read_conn().execute('''
+            SELECT timestamp, latency, packet_loss, status
+            FROM latency_data
+            WHERE interface = ? AND timestamp >= ?
+            ORDER BY timestamp DESC
+        ''', (interface, cutoff_time)).fetchall()
+    
     def generate_graph_data(self, interface: str, time_range: str = '1h') -> Dict:
         """Generate graph data for specified time range"""
         try:
@@ -496,7 +800,7 @@ class LatencyMonitor:
             }
             
             minutes = time_ranges.get(time_range, 60)
-            data = self.get_historical_data(interface, hours=minutes//60)
+            rows = self._graph_rows(interface, hours=minutes//60)
             
             # Generate graph data
             graph_data = {
@@ -509,15 +813,20 @@ class LatencyMonitor:
                 'generated_at': time.time()
             }
             
-            # Sample data every minute for better visualization
-            sample_interval = max(1, len(data) // 100)  # Max 100 data points
-            
-            for i, point in enumerate(data[::sample_interval]):
-                timestamp = datetime.fromtimestamp(point['timestamp'])
-                graph_data['labels'].append(timestamp.strftime('%H:%M'))
-                graph_data['latency_data'].append(round(point['latency'], 2))
-                graph_data['packet_loss_data'].append(round(point['packet_loss'], 2))
-                graph_data['status_data'].append(point['status'])
+            # Reduce to ~100 buckets of consecutive rows. Each point carries the
+            # bucket's worst latency and loss, so spikes between points are not
+            # dropped; labels and status come from the bucket's first row.
+            sample_interval = max(1, len(rows) // 100)  # Max 100 data points
+            
+            if rows:
+                # Columns once, then C-level max() over slices per bucket
+                timestamps, latencies, losses, statuses = zip(*rows)
+                for start in range(0, len(rows), sample_interval):
+                    end = start + sample_interval
+                    graph_data['labels'].append(time.strftime('%H:%M', time.localtime(timestamps[start])))
+                    graph_data['latency_data'].append(round(max(latencies[start:end]), 2))
+                    graph_data['packet_loss_data'].append(round(max(losses[start:end]), 2))
+                    graph_data['status_data'].append(statuses[start])
             
             # Add summary statistics
             summary = self.get_summary_statistics(interface, hours=minutes//60)
@@ -557,9 +866,8 @@ class LatencyMonitor:
                    hours: int = 24) -> str:
         """Export latency data in specified format"""
         try:
-            data = self.get_historical_data(interface, hours=hours)
-            
             if format == 'json':
+                data = self.get_historical_data(interface, hours=hours)
                 return json.dumps({
                     'interface': interface,
                     'export_time': time.time(),
@@ -569,11 +877,14 @@ class LatencyMonitor:
                 }, indent=2)
             
             elif format == 'csv':
-                csv_data = "timestamp,interface,target,latency,packet_loss,status\n"
-                for point in data:
-                    csv_data += f"{point['timestamp']},{point['interface']},{point['target']},"
-                    csv_data += f"{point['latency']},{point['packet_loss']},{point['status']}\n"
-                return csv_data
+                # Rows go straight from the cursor to csv.writer; no dicts and
+                # no repeated string concatenation
+                buf = io.StringIO()
+                writer = csv.writer(buf, lineterminator='\n')
+                writer.writerow(('timestamp', 'interface', 'target', 'latency', 'packet_loss', 'status'))
+                for rows in self.iter_export_rows(interface, hours):
+                    writer.writerows(rows)
+                return buf.getvalue()
             
             else:
                 return f"Unsupported format: {format}"
@@ -5,19 +5,58 @@ Provides web-based interface for adding and managing WAN interfaces
 """
 
 import os
+import errno
 import json
+import hashlib
 import logging
+import mmap
+import socket
 import subprocess
 import threading
 import time
-from typing import Dict, List, Optional
-from flask import Blueprint, render_template, jsonify, request
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from flask import Blueprint, Response, current_app, render_template, jsonify, request
 import sys
 
+try:
+    import orjson
+except ImportError:  # optional speedup; fall back to stdlib json
+    orjson = None
+
+try:
+    from pystemd.systemd1 import Unit as SystemdUnit
+except ImportError:  # optional; fall back to the systemctl binary
+    SystemdUnit = None
+
 # Add routing module to path
 sys.path.append('/opt/routeros/routing')
 from interface_detector import DynamicInterfaceDetector, NetworkInterface
 
+AVAILABLE_INTERFACES_TTL = 5.0  # seconds
+AVAILABLE_INTERFACES_MAX_AGE = 60.0  # seconds, backstop while link events are watched
+# rtnetlink multicast groups (linux/rtnetlink.h) for link and IPv4 address changes
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+SUGGESTION_TTL = 60.0  # seconds; spans the UI's suggest -> add round trip
+RESTART_DEBOUNCE = 1.0  # seconds a watchdog restart waits for further changes
+RESPONSE_CACHE_TTL = 5.0  # seconds polled read-only responses are reused
+WATCHDOG_UNIT = b'routeros-watchdog.service'
+
+# Fixed extras merged into every suggestion; tuples, so the shared values
+# cannot be altered through a returned suggestion
+_SUGGESTION_DEFAULTS = {
+    "weight_options": (1, 2, 3),
+    "dns_options": (
+        ("8.8.8.8", "8.8.4.4"),      # Google
+        ("1.1.1.1", "1.0.0.1"),      # Cloudflare
+        ("208.67.222.222", "208.67.220.220"),  # OpenDNS
+        ("9.9.9.9", "149.112.112.112")         # Quad9
+    ),
+    "requires_gateway": True,
+    "can_auto_detect": True
+}
+
 class WANManager:
     """Manages WAN interfaces through web interface"""
     
@@ -26,11 +65,37 @@ class WANManager:
         self.interfaces_file = os.path.join(self.config_dir, "interfaces.json")
         self.logger = self._setup_logging()
         self.interface_detector = DynamicInterfaceDetector()
-        self.lock = threading.Lock()
+        # Serializes writers only. Re-entrant so helpers called under it
+        # (config save, suggestions) may take it again. Readers never take it:
+        # writers edit a copy of the config and publish it on save.
+        self.lock = threading.RLock()
+        # (monotonic time, interface list) from the last detector scan
+        self._iface_cache = (0.0, None)
+        # Set once a netlink watch invalidates the scan on link changes
+        self._links_watched = False
+        self._links_changed_at = 0.0  # monotonic time of the last link event
+        self._link_change_hook: Optional[Callable[[], None]] = None
+        # interface name -> (monotonic time, suggestion) from suggest_wan_configuration
+        self._suggestions: Dict[str, Tuple[float, Dict]] = {}
+        # (st_mtime_ns, parsed interfaces.json), rebound whole on reload or save;
+        # the dict is a snapshot shared with every reader
+        self._config = (None, None)
+        # WAN name -> entry of the cached config's wan_interfaces, kept in step
+        # by _load_interfaces_config and _save_interfaces_config
+        self._wan_by_name: Dict[str, Dict] = {}
+        # Pending debounced watchdog restart, see _restart_services_if_needed
+        self._restart_lock = threading.Lock()
+        self._restart_timer = None
+        self._watchdog_unit = None  # pystemd unit proxy, loaded on first restart
+        self._start_link_watcher()
         
     def _setup_logging(self) -> logging.Logger:
         """Setup logging for WAN manager"""
         logger = logging.getLogger('wan-manager')
+        if logger.handlers:
+            # Another WANManager already attached the handlers; adding more
+            # would write every record again
+            return logger
         logger.setLevel(logging.INFO)
         
         # Create logs directory if it doesn't exist
@@ -57,7 +122,19 @@ class WANManager:
         return logger
     
     def get_available_interfaces(self) -> List[Dict]:
-        """Get list of available interfaces that can be added as WAN"""
+        """Get list of available interfaces that can be added as WAN
+        
+        Detector scans are reused until a link event arrives (bounded by
+        AVAILABLE_INTERFACES_MAX_AGE), or for AVAILABLE_INTERFACES_TTL seconds
+        when link events cannot be watched, so polling clients do not walk
+        every NIC on each request.
+        """
+        cached_at, cached = self._iface_cache
+        now = time.monotonic()
+        max_age = AVAILABLE_INTERFACES_MAX_AGE if self._links_watched else AVAILABLE_INTERFACES_TTL
+        if cached is not None and now - cached_at < max_age and cached_at > self._links_changed_at:
+            return cached
+        
         try:
             available = self.interface_detector.get_available_wan_interfaces()
             
@@ -72,14 +149,58 @@ class WANManager:
                     "interface_type": interface.interface_type
                 })
             
+            self._iface_cache = (now, interfaces)
             return interfaces
             
         except Exception as e:
             self.logger.error(f"Failed to get available interfaces: {e}")
             return []
     
+    def _start_link_watcher(self):
+        """Invalidate the interface scan on rtnetlink link/address events"""
+        try:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+            sock.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR))
+        except (AttributeError, OSError) as e:
+            self.logger.warning(f"Cannot watch link events, rescanning interfaces "
+                                f"every {AVAILABLE_INTERFACES_TTL}s: {e}")
+            return
+        
+        def watch():
+            while True:
+                try:
+                    # The message content does not matter; any event means
+                    # the last scan may be stale
+                    sock.recv(65536)
+                except OSError as e:
+                    if e.errno != errno.ENOBUFS:  # ENOBUFS: events were dropped
+                        self.logger.error(f"Link event watch stopped: {e}")
+                        self._links_watched = False
+                        sock.close()
+                        return
+                self._links_changed_at = time.monotonic()
+                hook = self._link_change_hook
+                if hook:
+                    hook()
+        
+        self._links_watched = True
+        threading.Thread(target=watch, daemon=True, name='link-watcher').start()
+    
+    def set_link_change_hook(self, hook: Optional[Callable[[], None]]):
+        """Set the callback run on every link event, after the scan is invalidated"""
+        self._link_change_hook = hook
+    
     def suggest_wan_configuration(self, interface_name: str) -> Dict:
-        """Get suggested configuration for a new WAN interface"""
+        """Get suggested configuration for a new WAN interface
+        
+        Suggestions are reused for SUGGESTION_TTL seconds, so the add that
+        follows the UI's /suggest request does not probe the interface again.
+        """
+        now = time.monotonic()
+        cached = self._suggestions.get(interface_name)
+        if cached is not None and now - cached[0] < SUGGESTION_TTL:
+            return cached[1]
+        
         try:
             suggestion = self.interface_detector.suggest_wan_configuration(interface_name)
             
@@ -87,18 +208,9 @@ class WANManager:
                 return {"error": suggestion["error"]}
             
             # Add additional suggestions
-            suggestion.update({
-                "weight_options": [1, 2, 3],
-                "dns_options": [
-                    ["8.8.8.8", "8.8.4.4"],      # Google
-                    ["1.1.1.1", "1.0.0.1"],      # Cloudflare
-                    ["208.67.222.222", "208.67.220.220"],  # OpenDNS
-                    ["9.9.9.9", "149.112.112.112"]         # Quad9
-                ],
-                "requires_gateway": True,
-                "can_auto_detect": True
-            })
+            suggestion.update(_SUGGESTION_DEFAULTS)
             
+            self._suggestions[interface_name] = (now, suggestion)
             return suggestion
             
         except Exception as e:
@@ -109,8 +221,9 @@ class WANManager:
         """Add a new WAN interface with automatic policy generation"""
         try:
             with self.lock:
-                # Load current configuration
-                current_config = self._load_interfaces_config()
+                # Load current configuration, copied so readers keep seeing
+                # the saved snapshot until the edit is published
+                current_config = dict(self._load_interfaces_config())
                 
                 # Validate interface name
                 interface_name = interface_config.get('name')
@@ -118,30 +231,33 @@ class WANManager:
                     return {"error": "Interface name is required"}
                 
                 # Check if interface already exists
-                existing_wans = current_config.get('wan_interfaces', [])
-                for wan in existing_wans:
-                    if wan['name'] == interface_name:
-                        return {"error": f"Interface {interface_name} is already configured as WAN"}
+                existing_wans = list(current_config.get('wan_interfaces', []))
+                if interface_name in self._wan_by_name:
+                    return {"error": f"Interface {interface_name} is already configured as WAN"}
                 
                 # Validate and prepare configuration
                 new_wan = self._prepare_wan_configuration(interface_config)
                 if "error" in new_wan:
                     return new_wan
                 
-                # Add to configuration
+                # Add to configuration; all edits go into current_config and
+                # are written by the single save below, under the same lock
                 existing_wans.append(new_wan)
                 current_config['wan_interfaces'] = existing_wans
                 
                 # Update auto-detection settings
-                if 'auto_detection' not in current_config:
-                    current_config['auto_detection'] = {}
-                current_config['auto_detection']['last_modified'] = self._get_timestamp()
+                current_config['auto_detection'] = {
+                    **current_config.get('auto_detection', {}),
+                    'last_modified': self._get_timestamp()
+                }
                 
                 # Save configuration
                 self._save_interfaces_config(current_config)
+                self._iface_cache = (0.0, None)
+                self._suggestions.pop(interface_name, None)
                 
                 # Generate and apply routing policies automatically
-                policy_result = self._generate_routing_policies(new_wan)
+                policy_result = self._generate_routing_policies(new_wan, current_config)
                 
                 # Restart services if needed
                 self._restart_services_if_needed()
@@ -163,17 +279,35 @@ class WANManager:
         """Prepare and validate WAN configuration"""
         interface_name = config.get('name')
         
-        # Get suggested configuration as base
+        # Get suggested configuration as base (reused from the suggestion cache)
         suggestion = self.suggest_wan_configuration(interface_name)
         if "error" in suggestion:
             return suggestion
         
-        # Merge user configuration with suggestions
+        # Merge user configuration with suggestions, validating each field
+        # before the entry is built
+        gateway = config.get('gateway', suggestion.get('gateway', '192.168.1.1'))
+        if not gateway:
+            return {"error": "Gateway is required"}
+        if not isinstance(gateway, str):
+            return {"error": "Gateway must be a string"}
+        
+        try:
+            weight = int(config.get('weight', suggestion.get('weight', 1)))
+        except (TypeError, ValueError):
+            return {"error": "Weight must be a number"}
+        if not 1 <= weight <= 10:
+            return {"error": "Weight must be between 1 and 10"}
+        
+        dns = config.get('dns', suggestion.get('dns')) or ["8.8.8.8", "8.8.4.4"]
+        if not isinstance(dns, list) or not all(isinstance(server, str) for server in dns):
+            return {"error": "DNS must be a list of addresses"}
+        
         wan_config = {
             "name": interface_name,
-            "gateway": config.get('gateway', suggestion.get('gateway', '192.168.1.1')),
-            "weight": int(config.get('weight', suggestion.get('weight', 1))),
-            "dns": config.get('dns', suggestion.get('dns', ["8.8.8.8", "8.8.4.4"])),
+            "gateway": gateway,
+            "weight": weight,
+            "dns": dns,
             "description": config.get('description', f"WAN Interface - {interface_name}"),
             "mac_address": suggestion.get('mac_address', 'unknown'),
             "speed": suggestion.get('speed'),
@@ -182,64 +316,53 @@ class WANManager:
             "added_date": self._get_timestamp()
         }
         
-        # Validate required fields
-        if not wan_config['gateway']:
-            return {"error": "Gateway is required"}
-        
-        # Validate weight
-        if wan_config['weight'] < 1 or wan_config['weight'] > 10:
-            return {"error": "Weight must be between 1 and 10"}
-        
-        # Validate DNS
-        if not wan_config['dns'] or len(wan_config['dns']) == 0:
-            wan_config['dns'] = ["8.8.8.8", "8.8.4.4"]
-        
         return wan_config
     
-    def _generate_routing_policies(self, wan_config: Dict) -> Dict:
-        """Automatically generate routing policies for new WAN interface"""
+    def _generate_routing_policies(self, wan_config: Dict, current_config: Dict) -> List[Dict]:
+        """Automatically generate routing policies for new WAN interface
+        
+        current_config is the configuration just saved, already including wan_config.
+        """
         try:
-            policies = []
-            
-            # Generate routing table entry
-            table_id = 100 + len(self._load_interfaces_config().get('wan_interfaces', []))
-            policies.append({
-                "type": "routing_table",
-                "table_id": table_id,
-                "interface": wan_config['name'],
-                "gateway": wan_config['gateway'],
-                "description": f"Routing table for {wan_config['name']}"
-            })
-            
-            # Generate multipath route entry
-            policies.append({
-                "type": "multipath_route",
-                "interface": wan_config['name'],
-                "weight": wan_config['weight'],
-                "gateway": wan_config['gateway'],
-                "description": f"Multipath route for {wan_config['name']}"
-            })
-            
-            # Generate nftables rules
-            policies.append({
-                "type": "nftables_rule",
-                "chain": "prerouting",
-                "interface": wan_config['name'],
-                "mark": f"0x{table_id:x}",
-                "description": f"Packet marking for {wan_config['name']}"
-            })
+            name = wan_config['name']
+            gateway = wan_config['gateway']
+            table_id = 100 + len(current_config.get('wan_interfaces', []))
             
-            # Generate health check configuration
-            policies.append({
-                "type": "health_check",
-                "interface": wan_config['name'],
-                "target": "1.1.1.1",
-                "timeout": 2,
-                "retry_count": 3,
-                "description": f"Health check for {wan_config['name']}"
-            })
+            # Built as one literal from locals: routing table, multipath
+            # route, nftables packet marking, health check
+            policies = [
+                {
+                    "type": "routing_table",
+                    "table_id": table_id,
+                    "interface": name,
+                    "gateway": gateway,
+                    "description": f"Routing table for {name}"
+                },
+                {
+                    "type": "multipath_route",
+                    "interface": name,
+                    "weight": wan_config['weight'],
+                    "gateway": gateway,
+                    "description": f"Multipath route for {name}"
+                },
+                {
+                    "type": "nftables_rule",
+                    "chain": "prerouting",
+                    "interface": name,
+                    "mark": f"0x{table_id:x}",
+                    "description": f"Packet marking for {name}"
+                },
+                {
+                    "type": "health_check",
+                    "interface": name,
+                    "target": "1.1.1.1",
+                    "timeout": 2,
+                    "retry_count": 3,
+                    "description": f"Health check for {name}"
+                },
+            ]
             
-            self.logger.info(f"Generated {len(policies)} routing policies for {wan_config['name']}")
+            self.logger.info(f"Generated {len(policies)} routing policies for {name}")
             return policies
             
         except Exception as e:
@@ -250,27 +373,22 @@ class WANManager:
         """Remove a WAN interface"""
         try:
             with self.lock:
-                current_config = self._load_interfaces_config()
+                current_config = dict(self._load_interfaces_config())
                 
                 # Find and remove the interface
-                wan_interfaces = current_config.get('wan_interfaces', [])
-                found = False
-                new_wans = []
-                
-                for wan in wan_interfaces:
-                    if wan['name'] == interface_name:
-                        found = True
-                        continue
-                    new_wans.append(wan)
-                
-                if not found:
+                if interface_name not in self._wan_by_name:
                     return {"error": f"Interface {interface_name} not found in WAN configuration"}
                 
-                # Update configuration
-                current_config['wan_interfaces'] = new_wans
+                # Update configuration from the loaded list itself, never the index
+                current_config['wan_interfaces'] = [
+                    wan for wan in current_config.get('wan_interfaces', [])
+                    if wan['name'] != interface_name
+                ]
                 
                 # Save configuration
                 self._save_interfaces_config(current_config)
+                self._iface_cache = (0.0, None)
+                self._suggestions.pop(interface_name, None)
                 
                 # Remove routing policies
                 self._remove_routing_policies(interface_name)
@@ -304,43 +422,132 @@ class WANManager:
             self.logger.error(f"Failed to remove routing policies: {e}")
     
     def _restart_services_if_needed(self):
-        """Restart services if configuration changed"""
+        """Restart services if configuration changed
+        
+        The restart runs RESTART_DEBOUNCE seconds later on a timer thread, and
+        changes made before it fires share it, so a burst of adds/removes
+        costs one restart and no request waits on systemctl.
+        """
+        with self._restart_lock:
+            if self._restart_timer is None:
+                self._restart_timer = threading.Timer(RESTART_DEBOUNCE, self._do_restart)
+                self._restart_timer.daemon = True
+                self._restart_timer.start()
+    
+    def _do_restart(self):
+        """Run the queued watchdog restart and log how it went"""
+        with self._restart_lock:
+            # Changes from here on queue a fresh restart
+            self._restart_timer = None
+        
+        if SystemdUnit is not None:
+            try:
+                self._restart_watchdog_dbus()
+                return
+            except Exception as e:
+                self._watchdog_unit = None  # reconnect next time
+                self.logger.warning(f"D-Bus restart of watchdog failed, using systemctl: {e}")
+        
+        proc = None
         try:
             # Restart watchdog service to pick up new configuration
-            result = subprocess.run(['systemctl', 'restart', 'routeros-watchdog'], 
-                                  capture_output=True, text=True, timeout=30)
+            proc = subprocess.Popen(['systemctl', 'restart', 'routeros-watchdog'],
+                                    stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            _, stderr = proc.communicate(timeout=30)
             
-            if result.returncode == 0:
+            if proc.returncode == 0:
                 self.logger.info("Watchdog service restarted successfully")
             else:
-                self.logger.error(f"Failed to restart watchdog service: {result.stderr}")
+                self.logger.error(f"Failed to restart watchdog service: {stderr}")
                 
-        except (subprocess.TimeoutExpired, subprocess.CalledProcessError) as e:
+        except (subprocess.TimeoutExpired, OSError) as e:
+            if proc is not None:
+                proc.kill()
+                proc.communicate()
             self.logger.error(f"Service restart failed: {e}")
     
+    def _restart_watchdog_dbus(self):
+        """Queue a watchdog restart job through systemd's D-Bus API"""
+        if self._watchdog_unit is None:
+            # One unit proxy (and its bus connection) reused for every restart
+            unit = SystemdUnit(WATCHDOG_UNIT)
+            unit.load()
+            self._watchdog_unit = unit
+        
+        job = self._watchdog_unit.Unit.Restart(b'replace')
+        self.logger.info(f"Watchdog service restart queued: {job.decode()}")
+    
     def _load_interfaces_config(self) -> Dict:
-        """Load interfaces configuration"""
+        """Load interfaces configuration
+        
+        The parsed file is kept and returned as-is until its mtime changes.
+        It is shared, so callers must not modify it; writers edit a copy and
+        pass that to _save_interfaces_config.
+        """
         try:
-            if os.path.exists(self.interfaces_file):
-                with open(self.interfaces_file, 'r') as f:
-                    return json.load(f)
+            mtime = os.stat(self.interfaces_file).st_mtime_ns
+            cached_mtime, config = self._config
+            if mtime == cached_mtime:
+                return config
+            
+            # Unbuffered: FileIO.readall sizes one read() from fstat, with no
+            # BufferedReader copy in between. orjson parses straight from a
+            # read-only mapping of the file instead, skipping even that copy.
+            with open(self.interfaces_file, 'rb', buffering=0) as f:
+                if orjson:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, \
+                         memoryview(mm) as view:
+                        config = orjson.loads(view)
+                else:
+                    config = json.loads(f.read())
+            self._config = (mtime, config)
+            self._index_wans(config)
+            return config
+        except FileNotFoundError:
+            pass
         except Exception as e:
             self.logger.error(f"Failed to load interfaces config: {e}")
         
+        # The index must match the empty config returned, not the last good file
+        self._wan_by_name = {}
         return {"wan_interfaces": [], "lan_interface": {}}
     
     def _save_interfaces_config(self, config: Dict):
         """Save interfaces configuration"""
         try:
             os.makedirs(self.config_dir, exist_ok=True)
-            with open(self.interfaces_file, 'w') as f:
-                json.dump(config, f, indent=2, default=str)
+            
+            if orjson:
+                data = orjson.dumps(config, default=str, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(config, indent=2, default=str).encode()
+            
+            # Write a temp file and rename it over the config, so a crash or
+            # a concurrent reader never sees a half-written file; the shared
+            # temp path and the cache update need the lock
+            with self.lock:
+                data = memoryview(data)
+                tmp_file = self.interfaces_file + '.tmp'
+                fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+                try:
+                    while data:
+                        data = data[os.write(fd, data):]
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+                os.replace(tmp_file, self.interfaces_file)
+                
+                self._config = (os.stat(self.interfaces_file).st_mtime_ns, config)
+                self._index_wans(config)
         except Exception as e:
             self.logger.error(f"Failed to save interfaces config: {e}")
     
+    def _index_wans(self, config: Dict):
+        """Rebuild the name index for config's WAN interfaces"""
+        self._wan_by_name = {wan['name']: wan for wan in config.get('wan_interfaces', [])}
+    
     def _get_timestamp(self) -> str:
         """Get current timestamp"""
-        from datetime import datetime
         return datetime.now().isoformat()
     
     def get_wan_statistics(self) -> Dict:
@@ -349,25 +556,33 @@ class WANManager:
             config = self._load_interfaces_config()
             wan_interfaces = config.get('wan_interfaces', [])
             
-            stats = {
-                "total_wans": len(wan_interfaces),
-                "auto_detected": sum(1 for wan in wan_interfaces if wan.get('auto_detected', False)),
-                "web_added": sum(1 for wan in wan_interfaces if wan.get('added_via_web', False)),
-                "interfaces": []
-            }
-            
+            # One pass builds the rows and both counters, reading each flag once
+            auto_detected = web_added = 0
+            interfaces = []
+            append = interfaces.append
             for wan in wan_interfaces:
-                stats["interfaces"].append({
+                auto = wan.get('auto_detected', False)
+                web = wan.get('added_via_web', False)
+                if auto:
+                    auto_detected += 1
+                if web:
+                    web_added += 1
+                append({
                     "name": wan['name'],
                     "weight": wan['weight'],
                     "gateway": wan['gateway'],
                     "description": wan.get('description', ''),
-                    "auto_detected": wan.get('auto_detected', False),
-                    "web_added": wan.get('added_via_web', False),
+                    "auto_detected": auto,
+                    "web_added": web,
                     "added_date": wan.get('added_date', 'Unknown')
                 })
             
-            return stats
+            return {
+                "total_wans": len(wan_interfaces),
+                "auto_detected": auto_detected,
+                "web_added": web_added,
+                "interfaces": interfaces
+            }
             
         except Exception as e:
             self.logger.error(f"Failed to get WAN statistics: {e}")
@@ -379,11 +594,42 @@ wan_manager_bp = Blueprint('wan_manager', __name__, url_prefix='/api/wan')
 # Initialize WAN manager
 wan_manager = WANManager()
 
+# view name -> (monotonic time, JSON body) for the polled read-only views;
+# cleared by every view that changes the WAN configuration
+_response_cache: Dict[str, Tuple[float, bytes]] = {}
+
+# /available sits in front of the interface scan, so drop it with the scan
+wan_manager.set_link_change_hook(lambda: _response_cache.pop('available', None))
+
+def _cached_json(key: str, build):
+    """JSON response for build(), reused for RESPONSE_CACHE_TTL seconds
+    
+    Error results are returned with a 500 and not cached. Clients that
+    already hold the body get a 304 via its ETag.
+    """
+    now = time.monotonic()
+    cached = _response_cache.get(key)
+    if cached is not None and now - cached[0] < RESPONSE_CACHE_TTL:
+        body = cached[1]
+    else:
+        data = build()
+        if "error" in data:
+            return jsonify(data), 500
+        # ORJSONProvider (json_provider.py) hands back bytes directly
+        provider = current_app.json
+        dumps_bytes = getattr(provider, 'dumps_bytes', None)
+        body = dumps_bytes(data) if dumps_bytes else provider.dumps(data).encode()
+        _response_cache[key] = (now, body)
+    
+    response = Response(body, mimetype='application/json')
+    response.set_etag(hashlib.blake2b(body, digest_size=8).hexdigest(), weak=True)
+    return response.make_conditional(request)
+
 @wan_manager_bp.route('/available')
 def get_available_interfaces():
     """Get available interfaces for WAN configuration"""
-    interfaces = wan_manager.get_available_interfaces()
-    return jsonify({"interfaces": interfaces})
+    return _cached_json('available',
+                        lambda: {"interfaces": wan_manager.get_available_interfaces()})
 
 @wan_manager_bp.route('/suggest/<interface_name>')
 def suggest_configuration(interface_name):
@@ -399,6 +645,7 @@ def add_wan_interface():
         return jsonify({"error": "No configuration provided"}), 400
     
     result = wan_manager.add_wan_interface(config)
+    _response_cache.clear()
     if "error" in result:
         return jsonify(result), 400
     
@@ -408,6 +655,7 @@ def add_wan_interface():
 def remove_wan_interface(interface_name):
     """Remove a WAN interface"""
     result = wan_manager.remove_wan_interface(interface_name)
+    _response_cache.clear()
     if "error" in result:
         return jsonify(result), 400
     
@@ -416,11 +664,7 @@ def remove_wan_interface(interface_name):
 @wan_manager_bp.route('/statistics')
 def get_wan_statistics():
     """Get WAN interface statistics"""
-    stats = wan_manager.get_wan_statistics()
-    if "error" in stats:
-        return jsonify(stats), 500
-    
-    return jsonify(stats)
+    return _cached_json('statistics', wan_manager.get_wan_statistics)
 
 @wan_manager_bp.route('/auto-detect', methods=['POST'])
 def auto_detect_primary_wan():
@@ -428,6 +672,8 @@ def auto_detect_primary_wan():
     try:
         detector = DynamicInterfaceDetector()
         result = detector.auto_configure_primary_wan()
+        wan_manager._iface_cache = (0.0, None)
+        _response_cache.clear()
         
         if "error" in result:
             return jsonify(result), 400